@@ -0,0 +1,792 @@
+"""
+Floppify benchmark harness.
+
+Runs floppify against a local stand-in for the Spotify Web API and a
+temp-directory "floppy" whose insert and eject are scripted, then reports
+latencies and API traffic as JSON so builds can be compared:
+
+    python benchmark.py                       # all scenarios, JSON to stdout
+    python benchmark.py --output bench.json --latency 0.05 --rate-limit-every 20
+    xvfb-run python benchmark.py --scenarios soak --soak-hours 48   # needs a display; exits 1 if memory keeps growing
+
+No Spotify account, credentials or floppy drive are needed.
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qs, urlsplit
+
+BENCH_DEVICE_ID = 'bench-device'
+
+# ----------------------------
+# Fake Spotify Web API
+# ----------------------------
+
+class FakeSpotifyState:
+    """
+    In-memory model of one Spotify account: a single Connect device and a
+    player that walks through fake tracks of a fixed duration.
+    """
+
+    def __init__(self, track_duration_ms=180000):
+        self.track_duration_ms = track_duration_ms
+        self.lock = threading.Lock()
+        self.device = {'id': BENCH_DEVICE_ID, 'is_active': False, 'is_private_session': False,
+                       'is_restricted': False, 'name': 'Bench Speaker', 'type': 'Speaker',
+                       'volume_percent': 50, 'supports_volume': True}
+        self.context_uri = None
+        self.is_playing = False
+        self.started_at = None  # time.time() the current context started at position 0
+        self.paused_progress_ms = 0
+        self.shuffle_state = False
+        self.repeat_state = 'off'
+
+    @staticmethod
+    def track(context_uri, index):
+        digest = hashlib.sha1(f"{context_uri}:{index}".encode()).hexdigest()[:22]
+        album_id = hashlib.sha1(f"{context_uri}:album:{index // 4}".encode()).hexdigest()[:22]
+        return {
+            'id': digest,
+            'uri': f'spotify:track:{digest}',
+            'name': f'Bench Track {index}',
+            'artists': [{'name': 'Bench Artist'}],
+            'album': {
+                'name': f'Bench Album {index // 4}',
+                'images': [{'url': f'/covers/{album_id}/{size}.jpg', 'width': size, 'height': size}
+                           for size in (640, 300, 64)],
+            },
+        }
+
+    def progress_ms(self, now):
+        if self.is_playing and self.started_at is not None:
+            return int((now - self.started_at) * 1000)
+        return self.paused_progress_ms
+
+    def player(self, base_url):
+        """Builds a /me/player response, or None when nothing is loaded."""
+        with self.lock:
+            if self.context_uri is None:
+                return None
+            now = time.time()
+            total_ms = self.progress_ms(now)
+            index, progress = divmod(total_ms, self.track_duration_ms)
+            item = self.track(self.context_uri, index)
+            item['duration_ms'] = self.track_duration_ms
+            for image in item['album']['images']:
+                image['url'] = base_url + image['url']
+            return {
+                'device': dict(self.device),
+                'shuffle_state': self.shuffle_state,
+                'repeat_state': self.repeat_state,
+                'timestamp': int(now * 1000),
+                'progress_ms': progress,
+                'is_playing': self.is_playing,
+                'item': item,
+                'context': {'uri': self.context_uri},
+            }
+
+    def queue(self, base_url, count=5):
+        with self.lock:
+            if self.context_uri is None:
+                return []
+            index = self.progress_ms(time.time()) // self.track_duration_ms
+            context_uri = self.context_uri
+        items = [self.track(context_uri, index + offset) for offset in range(1, count + 1)]
+        for item in items:
+            for image in item['album']['images']:
+                image['url'] = base_url + image['url']
+        return items
+
+    def play(self, context_uri=None):
+        with self.lock:
+            self.device['is_active'] = True
+            if context_uri:
+                self.context_uri = context_uri
+                self.started_at = time.time()
+            elif self.context_uri and not self.is_playing:
+                self.started_at = time.time() - self.paused_progress_ms / 1000
+            self.is_playing = self.context_uri is not None
+
+    def pause(self):
+        with self.lock:
+            if self.is_playing:
+                self.paused_progress_ms = self.progress_ms(time.time())
+            self.is_playing = False
+
+    def skip(self, tracks):
+        with self.lock:
+            if self.context_uri is None:
+                return
+            index = self.progress_ms(time.time()) // self.track_duration_ms
+            position_ms = max(0, index + tracks) * self.track_duration_ms
+            self.started_at = time.time() - position_ms / 1000
+            self.paused_progress_ms = position_ms
+
+class FakeSpotifyServer:
+    """
+    Local HTTP stand-in for the Spotify Web API endpoints floppify uses, with
+    configurable per-request latency and 429 injection. Every request is
+    recorded so scenarios can count calls and time events.
+    """
+
+    ITEM_TYPES = {'playlists': 'playlist', 'albums': 'album', 'tracks': 'track', 'artists': 'artist'}
+
+    def __init__(self, latency=0.0, rate_limit_every=0, retry_after=1, track_duration_ms=180000):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.state = FakeSpotifyState(track_duration_ms)
+        self.requests = []  # (time.perf_counter(), method, endpoint, status)
+        self.requests_lock = threading.Lock()
+        self.request_count = 0
+        self.covers = {}
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.base_url = f'http://127.0.0.1:{self.httpd.server_port}'
+        self.api_prefix = f'{self.base_url}/v1/'
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, name='fake-spotify', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def record(self, method, endpoint, status):
+        with self.requests_lock:
+            self.requests.append((time.perf_counter(), method, endpoint, status))
+
+    def calls(self, since=0.0, endpoint=None):
+        """Returns recorded requests made after `since` (perf_counter), optionally for one endpoint."""
+        with self.requests_lock:
+            return [request for request in self.requests
+                    if request[0] >= since and (endpoint is None or request[2] == endpoint)]
+
+    def wait_for(self, endpoint, since, timeout=10.0):
+        """Waits for a successful request to endpoint after `since`; returns its time or None."""
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            for request in self.calls(since, endpoint):
+                if request[3] < 300:
+                    return request[0]
+            time.sleep(0.002)
+        return None
+
+    def cover_bytes(self, album_id, size):
+        key = (album_id, size)
+        if key not in self.covers:
+            from PIL import Image
+            color = tuple(bytes.fromhex(hashlib.sha1(album_id.encode()).hexdigest()[:6]))
+            buffer = BytesIO()
+            Image.new('RGB', (size, size), color).save(buffer, format='JPEG', quality=85)
+            self.covers[key] = buffer.getvalue()
+        return self.covers[key]
+
+    def audio_analysis(self, track_id):
+        """Deterministic stand-in for /audio-analysis: segments with loudness envelopes and timbre."""
+        rng = random.Random(track_id)
+        segments = []
+        start = 0.0
+        duration_s = self.state.track_duration_ms / 1000
+        while start < duration_s:
+            length = rng.uniform(0.08, 0.6)
+            segments.append({
+                'start': round(start, 5), 'duration': round(length, 5), 'confidence': rng.random(),
+                'loudness_start': round(rng.uniform(-35, -15), 3), 'loudness_max': round(rng.uniform(-15, -2), 3),
+                'loudness_max_time': round(length * rng.uniform(0.05, 0.4), 5),
+                'pitches': [round(rng.random(), 3) for _ in range(12)],
+                'timbre': [round(rng.gauss(0, 40), 3) for _ in range(12)],
+            })
+            start += length
+        return {'meta': {'analyzer_version': 'bench'}, 'track': {'duration': duration_s}, 'segments': segments}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                self.dispatch('GET')
+
+            def do_PUT(self):
+                self.dispatch('PUT')
+
+            def do_POST(self):
+                self.dispatch('POST')
+
+            def send_json(self, status, body=None, headers=None):
+                data = json.dumps(body).encode() if body is not None else b''
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                if data:
+                    self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def read_body(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                if not length:
+                    return {}
+                try:
+                    return json.loads(self.rfile.read(length))
+                except ValueError:
+                    return {}
+
+            def dispatch(self, method):
+                url = urlsplit(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                body = self.read_body()
+                endpoint = re.sub(r'/(playlists|albums|tracks|artists|audio-analysis)/[^/]+',
+                                  r'/\1/{id}', url.path)
+                endpoint = re.sub(r'^/covers/.*', '/covers/{id}', endpoint)
+                if server.latency:
+                    time.sleep(server.latency)
+
+                with server.requests_lock:
+                    server.request_count += 1
+                    limited = (server.rate_limit_every and url.path.startswith('/v1/')
+                               and server.request_count % server.rate_limit_every == 0)
+                if limited:
+                    server.record(method, endpoint, 429)
+                    self.send_json(429, {'error': {'status': 429, 'message': 'API rate limit exceeded'}},
+                                   headers={'Retry-After': str(server.retry_after)})
+                    return
+
+                status, payload, content_type = self.route(method, url.path, query, body)
+                server.record(method, endpoint, status)
+                if content_type:
+                    self.send_response(status)
+                    self.send_header('Content-Type', content_type)
+                    self.send_header('Content-Length', str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                else:
+                    self.send_json(status, payload)
+
+            def route(self, method, path, query, body):
+                state = server.state
+                device_ok = query.get('device_id') in (None, BENCH_DEVICE_ID)
+                if path == '/v1/me/player' and method == 'GET':
+                    player = state.player(server.base_url)
+                    return (200, player, None) if player else (204, None, None)
+                if path == '/v1/me/player' and method == 'PUT':
+                    if BENCH_DEVICE_ID not in body.get('device_ids', []):
+                        return 404, {'error': {'status': 404, 'message': 'Device not found'}}, None
+                    state.device['is_active'] = True
+                    if body.get('play'):
+                        state.play()
+                    return 204, None, None
+                if path == '/v1/me/player/devices':
+                    return 200, {'devices': [dict(state.device)]}, None
+                if path == '/v1/me/player/queue' and method == 'GET':
+                    return 200, {'currently_playing': None, 'queue': state.queue(server.base_url)}, None
+                if not device_ok:
+                    return 404, {'error': {'status': 404, 'message': 'Device not found'}}, None
+                if path == '/v1/me/player/play':
+                    context_uri = body.get('context_uri') or (body.get('uris') or [None])[0]
+                    state.play(context_uri)
+                    return 204, None, None
+                if path == '/v1/me/player/pause':
+                    state.pause()
+                    return 204, None, None
+                if path == '/v1/me/player/volume':
+                    state.device['volume_percent'] = int(query.get('volume_percent', 0))
+                    return 204, None, None
+                if path == '/v1/me/player/shuffle':
+                    state.shuffle_state = query.get('state') == 'true'
+                    return 204, None, None
+                if path == '/v1/me/player/repeat':
+                    state.repeat_state = query.get('state', 'off')
+                    return 204, None, None
+                if path in ('/v1/me/player/next', '/v1/me/player/previous'):
+                    state.skip(1 if path.endswith('next') else -1)
+                    return 204, None, None
+                match = re.match(r'^/v1/(playlists|albums|tracks|artists)/([^/]+)$', path)
+                if match and method == 'GET':
+                    return self.item(match.group(1), match.group(2), query.get('fields'))
+                match = re.match(r'^/v1/audio-analysis/([^/]+)$', path)
+                if match:
+                    return 200, server.audio_analysis(match.group(1)), None
+                match = re.match(r'^/covers/([^/]+)/(\d+)\.jpg$', path)
+                if match:
+                    return 200, server.cover_bytes(match.group(1), int(match.group(2))), 'image/jpeg'
+                return 404, {'error': {'status': 404, 'message': 'Not found'}}, None
+
+            def item(self, collection, item_id, fields=None):
+                if item_id.startswith('dead'):
+                    return 404, {'error': {'status': 404, 'message': 'Resource not found'}}, None
+                uri_type = FakeSpotifyServer.ITEM_TYPES[collection]
+                images = [{'url': f'{server.base_url}/covers/{item_id}/{size}.jpg', 'width': size, 'height': size}
+                          for size in (640, 300, 64)]
+                item = {'id': item_id, 'uri': f'spotify:{uri_type}:{item_id}',
+                        'name': f'Bench {uri_type.title()} {item_id}', 'images': images}
+                if uri_type == 'track':
+                    item = {'id': item_id, 'uri': item['uri'], 'name': item['name'],
+                            'album': {'name': 'Bench Album', 'images': images}}
+                elif uri_type in ('playlist', 'album'):
+                    # Real responses embed the first page of tracks; mimic the payload size
+                    item['tracks'] = {'items': [{'track': FakeSpotifyState.track(item['uri'], index)}
+                                                for index in range(100)]}
+                if fields:
+                    # Top-level field filter, as the playlists endpoint supports
+                    item = {key: value for key, value in item.items() if key in fields.split(',')}
+                return 200, item, None
+
+        return Handler
+
+# ----------------------------
+# Simulated Floppy
+# ----------------------------
+
+def build_fat12_image(files, serial=0x12345678, label='FLOPPIFY', fragment=False):
+    """
+    Builds a 1.44 MB FAT12 floppy image holding files ({8.3 name: bytes}) in
+    the root directory. With fragment=True each file's clusters are spread
+    out, so readers have to follow the FAT chain.
+    """
+    sector, total_sectors, fat_sectors, root_entries = 512, 2880, 9, 224
+    image = bytearray(sector * total_sectors)
+    struct.pack_into('<3s8sHBHBHHBHHHIIBBBI11s8s', image, 0, b'\xEB\x3C\x90', b'MSWIN4.1', sector, 1, 1, 2,
+                     root_entries, total_sectors, 0xF0, fat_sectors, 18, 2, 0, 0, 0, 0, 0x29, serial,
+                     label.upper().ljust(11).encode('ascii'), b'FAT12   ')
+    image[510:512] = b'\x55\xAA'
+    fat = {0: 0xFF0, 1: 0xFFF}
+    root_offset = sector * (1 + 2 * fat_sectors)
+    data_offset = root_offset + root_entries * 32
+    next_free = 2
+    for index, (name, data) in enumerate(files.items()):
+        count = max(1, -(-len(data) // sector))
+        clusters = [next_free + i * (2 if fragment else 1) for i in range(count)]
+        next_free = clusters[-1] + 1
+        for position, cluster in enumerate(clusters):
+            fat[cluster] = clusters[position + 1] if position + 1 < count else 0xFFF
+            chunk = data[position * sector:(position + 1) * sector]
+            start = data_offset + (cluster - 2) * sector
+            image[start:start + len(chunk)] = chunk
+        base, _, ext = name.upper().partition('.')
+        struct.pack_into('<8s3sB10sHHHI', image, root_offset + index * 32, base.ljust(8).encode('ascii'),
+                         ext.ljust(3).encode('ascii'), 0x20, b'', 0x6000, 0x5A21, clusters[0], len(data))
+    for copy in range(2):
+        fat_offset = sector * (1 + copy * fat_sectors)
+        for cluster, value in fat.items():
+            offset = fat_offset + cluster + cluster // 2
+            pair = struct.unpack_from('<H', image, offset)[0]
+            if cluster & 1:
+                pair = (pair & 0x000F) | (value << 4)
+            else:
+                pair = (pair & 0xF000) | value
+            struct.pack_into('<H', image, offset, pair)
+    return bytes(image)
+
+class SimulatedFloppy:
+    """
+    A temp directory standing in for a mounted floppy, or with image=True a
+    FAT12 image file read through floppify's raw reader; insert and eject
+    are scripted.
+    """
+
+    def __init__(self, root=None, image=False):
+        self.root = root or tempfile.mkdtemp(prefix='floppify-bench-floppy-')
+        self.image = image
+        self.path = os.path.join(self.root, 'floppy.img') if image else self.root
+
+    def insert(self, lines, unique_id=None):
+        """Writes a disk's files; playlist.txt appears atomically, like a mount."""
+        if self.image:
+            serial = zlib.crc32((unique_id or str(time.time())).encode())
+            data = build_fat12_image({'PLAYLIST.TXT': ('\n'.join(lines) + '\n').encode()}, serial=serial,
+                                     fragment=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+            return
+        if unique_id:
+            with open(os.path.join(self.path, 'unique_id.txt'), 'w') as f:
+                f.write(unique_id)
+        tmp_path = os.path.join(self.path, '.playlist.tmp')
+        with open(tmp_path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, os.path.join(self.path, 'playlist.txt'))
+
+    def eject(self):
+        for name in ('playlist.txt', 'unique_id.txt', 'floppy.img'):
+            try:
+                os.remove(os.path.join(self.root, name))
+            except FileNotFoundError:
+                pass
+
+    def cleanup(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+# ----------------------------
+# Harness
+# ----------------------------
+
+def summarize(samples):
+    """Latency summary in milliseconds."""
+    samples = [sample * 1000 for sample in samples if sample is not None]
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered), 3),
+        'p50_ms': round(ordered[len(ordered) // 2], 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        'max_ms': round(ordered[-1], 3),
+    }
+
+def load_floppify(server, floppy, workdir):
+    """Imports floppify configured against the fake API, the simulated floppy and temp caches."""
+    os.environ.update({
+        'CLIENT_ID': 'bench',
+        'CLIENT_SECRET': 'bench',
+        'REDIRECT_URI': 'http://127.0.0.1:8888/callback',
+        'LOCAL_DEVICE_ID': BENCH_DEVICE_ID,
+        'SPOTIFY_API_PREFIX': server.api_prefix,
+        'FLOPPY_MOUNT_PATH': floppy.path,
+        'CATALOG_PATH': os.path.join(workdir, 'catalog.db'),
+        'COVER_CACHE_DIR': os.path.join(workdir, 'covers'),
+        'LOG_FILE': '',
+        'LOG_LEVEL': os.environ.get('LOG_LEVEL', 'WARNING'),
+    })
+    import floppify
+    floppify.gui_log_enabled = False
+    # Cached for connect_spotify(), so the harness starts the same services as the app
+    floppify.sp_oauth.cache_handler.cache_path = os.path.join(workdir, 'token-cache')
+    floppify.sp_oauth.cache_handler.save_token_to_cache({
+        'access_token': 'bench', 'refresh_token': 'bench', 'token_type': 'Bearer',
+        'scope': floppify.sp_oauth.scope, 'expires_in': 86400, 'expires_at': int(time.time()) + 86400})
+    return floppify
+
+def run_disk_scenario(server, floppy, iterations):
+    """Insert-to-play and eject-to-stop latency, cold (new disk) and warm (known disk)."""
+    results = {}
+    for phase in ('cold', 'warm'):
+        insert_latencies = []
+        eject_latencies = []
+        for index in range(iterations):
+            unique_id = f'bench-disk-{index}'
+            lines = [f'spotify:album:album{index}x{entry}' for entry in range(8)]
+            start = time.perf_counter()
+            floppy.insert(lines, unique_id=unique_id)
+            played = server.wait_for('/v1/me/player/play', start)
+            insert_latencies.append(played - start if played else None)
+            time.sleep(0.2)
+            start = time.perf_counter()
+            floppy.eject()
+            stopped = server.wait_for('/v1/me/player/pause', start)
+            eject_latencies.append(stopped - start if stopped else None)
+            time.sleep(0.2)
+        results[phase] = {
+            'insert_to_play': summarize(insert_latencies),
+            'eject_to_stop': summarize(eject_latencies),
+            'timeouts': sum(latency is None for latency in insert_latencies + eject_latencies),
+        }
+    return results
+
+def run_fat12_scenario(floppify, workdir):
+    """
+    Checks the raw FAT12 reader against images from build_fat12_image: a
+    contiguous file, a fragmented chain over odd FAT12 entries after a file
+    on an even one, a disk without playlist.txt and an image that is not FAT.
+    """
+    playlist = b''.join(b'spotify:album:fat12check%04d\n' % index for index in range(60))  # Several clusters
+    cases = {
+        'contiguous': ({'PLAYLIST.TXT': playlist}, False),
+        'fragmented_odd_chain': ({'UNIQUE.TXT': b'x', 'PLAYLIST.TXT': playlist}, True),
+        'missing_playlist': ({'README.TXT': b'no playlist here'}, False),
+    }
+    checked, failures = [], []
+
+    def check(name, condition):
+        checked.append(name)
+        if not condition:
+            failures.append(name)
+
+    for name, (files, fragment) in cases.items():
+        path = os.path.join(workdir, f'{name}.img')
+        with open(path, 'wb') as f:
+            f.write(build_fat12_image(files, serial=0xCAFE0123, fragment=fragment))
+        lines, _ = floppify.read_playlist(path)
+        check(f'{name}: serial', floppify.read_unique_id(path) == 'fat-CAFE0123')
+        if 'PLAYLIST.TXT' in files:
+            check(f'{name}: playlist', lines == playlist.decode().split())
+            check(f'{name}: signature', floppify.playlist_signature(path) is not None)
+        else:
+            check(f'{name}: no playlist', lines is None and floppify.playlist_signature(path) is None)
+
+    path = os.path.join(workdir, 'not_fat.img')
+    with open(path, 'wb') as f:
+        f.write(bytes(random.Random(0).getrandbits(8) for _ in range(1474560)))
+    check('not_fat: rejected', floppify.open_raw_volume(path) is None and floppify.read_unique_id(path) is None
+          and floppify.playlist_signature(path) is None and floppify.read_playlist(path) == (None, None))
+    return {'checks': len(checked), 'failed': failures, 'passed': not failures}
+
+def run_traffic_scenario(floppify, server, duration=None):
+    """
+    API calls per minute with nothing playing, then while playing, counted
+    over several idle poll periods (3 x PLAYBACK_POLL_IDLE by default).
+    Playback is stopped and started through the app, and counting begins
+    once the playback monitor has seen the change and its post-command
+    burst of polls is over.
+    """
+    duration = duration or 3 * floppify.PLAYBACK_POLL_IDLE
+    results = {}
+    for phase in ('idle', 'playing'):
+        playing = phase == 'playing'
+        if playing:
+            floppify.play_spotify_uri('spotify:album:benchtraffic')
+        else:
+            floppify.stop_playback()
+        changed = time.perf_counter()
+        while floppify.playback_clock.is_playing != playing and time.perf_counter() - changed < 10:
+            time.sleep(0.05)
+        seen = time.perf_counter() - changed
+        time.sleep(floppify.PLAYBACK_POLL_BURST_WINDOW + 1.0)  # Let the burst after the command finish
+        start = time.perf_counter()
+        time.sleep(duration)
+        calls = server.calls(start)
+        per_endpoint = Counter(f'{method} {endpoint}' for _, method, endpoint, _ in calls)
+        results[phase] = {
+            'monitor_saw_change_s': round(seen, 2) if floppify.playback_clock.is_playing == playing else None,
+            'seconds_counted': duration,
+            'calls_per_minute': round(len(calls) * 60 / duration, 2),
+            'by_endpoint': dict(per_endpoint.most_common()),
+        }
+    floppify.stop_playback()
+    return results
+
+def open_tk_root():
+    """Returns (Tk root, None), or (None, reason) when no display is available."""
+    if sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
+        return None, 'no display available'
+    try:
+        import tkinter as tk
+        return tk.Tk(), None
+    except Exception as e:
+        return None, f'Tk unavailable: {e}'
+
+def run_gui_scenario(floppify, ticks):
+    """Time per GUI tick (queue drain, delta apply and redraw) while deltas keep arriving."""
+    root, reason = open_tk_root()
+    if root is None:
+        return {'skipped': reason}
+    import floppify_gui
+    app = floppify_gui.FloppifyPlayer(root)
+    root.update()
+    samples = []
+    for index in range(ticks):
+        floppify.state_queue.put({'track': f'Bench Track {index}', 'artist': 'Bench Artist',
+                                  'album': f'Bench Album {index // 4}', 'is_playing': True})
+        floppify.log_queue.put(f'Bench log line {index}')
+        start = time.perf_counter()
+        app.update_gui()
+        root.update_idletasks()
+        samples.append(time.perf_counter() - start)
+    root.destroy()
+    return {'tick': summarize(samples)}
+
+def run_visualiser_scenario(floppify, tracks, frames):
+    """Audio-analysis fetch and timeline build per track, then spectrum frame time (no display needed)."""
+    try:
+        import numpy as np
+        import floppify_gui
+    except ImportError as e:
+        return {'skipped': f'GUI dependencies unavailable: {e}'}
+    build_samples = []
+    frame_samples = []
+    renderer = floppify_gui.SpectrumRenderer()
+    for index in range(tracks):
+        start = time.perf_counter()
+        timeline = floppify_gui.SpectrumTimeline(floppify.sp.audio_analysis(f'benchtrack{index}'))
+        build_samples.append(time.perf_counter() - start)
+        peaks = None
+        for frame in range(frames):
+            start = time.perf_counter()
+            levels = timeline.levels(frame / 60)  # 60 fps walk through the track
+            peaks = levels if peaks is None else np.maximum(peaks - 0.01, levels)
+            renderer.render(levels, peaks)
+            frame_samples.append(time.perf_counter() - start)
+    return {'fetch_and_build': summarize(build_samples), 'frame': summarize(frame_samples)}
+
+def current_rss():
+    """Resident set size in bytes (peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+def run_soak_scenario(floppify, server, hours, max_growth_mb, track_seconds=210):
+    """
+    Replays `hours` of track changes (one every track_seconds of simulated
+    time, a new album cover every fourth track) through the playback monitor,
+    cover cache and the GUI's apply_state. Memory is sampled after a warm-up;
+    the scenario fails if RSS or traced Python allocations grow by more than
+    max_growth_mb. It is skipped without a display, since the reused cover
+    PhotoImage is the main thing under test.
+    """
+    import gc
+    import tracemalloc
+    changes = max(50, int(hours * 3600 / track_seconds))
+    warmup = max(20, changes // 10)
+    root, reason = open_tk_root()
+    if root is None:
+        return {'skipped': reason}
+    import floppify_gui
+    app = floppify_gui.FloppifyPlayer(root)
+    floppify.gui_log_enabled = True
+
+    def consume(delta):
+        app.apply_state(delta)
+        app.drain_log_queue()
+        root.update_idletasks()
+
+    monitor = floppify.PlaybackStateMonitor()  # Polled by hand, never started
+    snapshot_ttl, floppify.playback_snapshot.ttl = floppify.playback_snapshot.ttl, 0.0  # Every poll fetches
+    server.state.play('spotify:album:benchsoak')
+    tracemalloc.start()
+    samples = []
+    baseline_rss = baseline_snapshot = None
+    start = time.perf_counter()
+    try:
+        for change in range(changes):
+            server.state.skip(1)
+            monitor.poll()
+            monitor._cover_worker.submit(lambda: None).result()  # Let an uncached cover arrive too
+            while not floppify.state_queue.empty():
+                consume(floppify.state_queue.get_nowait())
+            if change + 1 == warmup:
+                gc.collect()
+                baseline_rss = current_rss()
+                baseline_snapshot = tracemalloc.take_snapshot()
+            if change % max(1, changes // 20) == 0:
+                samples.append({'change': change, 'rss_mb': round(current_rss() / 2 ** 20, 2),
+                                'traced_mb': round(tracemalloc.get_traced_memory()[0] / 2 ** 20, 2)})
+        gc.collect()
+        final_rss = current_rss()
+        final_snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+        floppify.playback_snapshot.ttl = snapshot_ttl
+        server.state.pause()
+        root.destroy()
+
+    diff = final_snapshot.compare_to(baseline_snapshot, 'lineno')
+    traced_growth = sum(stat.size_diff for stat in diff)
+    rss_growth = final_rss - baseline_rss
+    limit = max_growth_mb * 2 ** 20
+    return {
+        'simulated_hours': round(changes * track_seconds / 3600, 1),
+        'track_changes': changes,
+        'wall_seconds': round(time.perf_counter() - start, 2),
+        'rss_growth_mb': round(rss_growth / 2 ** 20, 3),
+        'traced_growth_mb': round(traced_growth / 2 ** 20, 3),
+        'max_growth_mb': max_growth_mb,
+        'top_growth': [f'{stat.traceback}: {stat.size_diff / 1024:+.1f} KiB'
+                       for stat in sorted(diff, key=lambda stat: -stat.size_diff)[:5]],
+        'samples': samples,
+        'passed': rss_growth <= limit and traced_growth <= limit,
+    }
+
+def build_info():
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        revision = None
+    return {'git_revision': revision, 'python': platform.python_version(), 'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z')}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark floppify against a fake Spotify API and floppy")
+    parser.add_argument('--scenarios', default='disk,traffic,gui,visualiser,fat12',
+                        help="comma-separated scenarios to run, plus 'soak' (default: %(default)s)")
+    parser.add_argument('--iterations', type=int, default=5, help="insert/eject cycles per phase")
+    parser.add_argument('--duration', type=float, default=None,
+                        help="seconds to count API traffic per phase (default: 3 x PLAYBACK_POLL_IDLE)")
+    parser.add_argument('--ticks', type=int, default=200, help="GUI ticks to time")
+    parser.add_argument('--latency', type=float, default=0.0, help="fake API latency per request, seconds")
+    parser.add_argument('--rate-limit-every', type=int, default=0, help="answer every Nth API request with a 429")
+    parser.add_argument('--retry-after', type=int, default=1, help="Retry-After seconds sent with injected 429s")
+    parser.add_argument('--floppy-image', action='store_true',
+                        help="simulate the floppy as a FAT12 disk image read by the raw reader")
+    parser.add_argument('--soak-hours', type=float, default=24.0, help="simulated hours of track changes to soak")
+    parser.add_argument('--soak-max-growth-mb', type=float, default=8.0,
+                        help="fail the soak if RSS or traced memory grows by more than this after warm-up")
+    parser.add_argument('--output', help="write JSON results here instead of stdout")
+    return parser.parse_args()
+
+def run(args):
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    workdir = tempfile.mkdtemp(prefix='floppify-bench-')
+    server = FakeSpotifyServer(latency=args.latency, rate_limit_every=args.rate_limit_every,
+                               retry_after=args.retry_after).start()
+    floppy = SimulatedFloppy(image=args.floppy_image)
+    results = {'build': build_info(), 'config': {key: value for key, value in vars(args).items() if key != 'output'},
+               'scenarios': {}}
+    try:
+        floppify = load_floppify(server, floppy, workdir)
+        if not floppify.connect_spotify():
+            raise RuntimeError("floppify could not see the benchmark device")
+        floppify.start_player_services()
+        time.sleep(0.5)
+        if 'disk' in scenarios:
+            results['scenarios']['disk'] = run_disk_scenario(server, floppy, args.iterations)
+        if 'traffic' in scenarios:
+            results['scenarios']['traffic'] = run_traffic_scenario(floppify, server, args.duration)
+        if 'gui' in scenarios:
+            results['scenarios']['gui'] = run_gui_scenario(floppify, args.ticks)
+        if 'visualiser' in scenarios:
+            results['scenarios']['visualiser'] = run_visualiser_scenario(floppify, tracks=3, frames=args.ticks)
+        if 'fat12' in scenarios:
+            results['scenarios']['fat12'] = run_fat12_scenario(floppify, workdir)
+        if 'soak' in scenarios:
+            results['scenarios']['soak'] = run_soak_scenario(floppify, server, args.soak_hours,
+                                                            args.soak_max_growth_mb)
+        results['total_api_requests'] = len(server.calls())
+        results['injected_429s'] = sum(1 for request in server.calls() if request[3] == 429)
+    finally:
+        server.stop()
+        floppy.cleanup()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+if __name__ == '__main__':
+    args = parse_args()
+    results = run(args)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    if not all(result.get('passed', True) for result in results['scenarios'].values()):
+        sys.exit(1)
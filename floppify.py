@@ -1,17 +1,34 @@
+import argparse
+import atexit
+import logging
+import logging.handlers
 import os
+import sys
 import time
+STARTUP_T0 = time.perf_counter()  # Origin of the startup timeline
+import select
+import mmap
+import struct
 import threading
-import tkinter as tk
-from tkinter import messagebox
-from PIL import Image, ImageTk
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
+from spotipy.cache_handler import CacheFileHandler
 import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+from email.utils import parsedate_to_datetime
 from io import BytesIO
 import random
-import tkinter.font as tkFont
 import uuid  # For generating unique IDs
 import queue  # For thread-safe message passing
+import hashlib
+import json
+import functools
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import sqlite3
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait
 from dotenv import load_dotenv  # To load environment variables
 
 # Load environment variables from .env file
@@ -23,18 +40,459 @@ CLIENT_SECRET = os.getenv('CLIENT_SECRET')
 REDIRECT_URI = os.getenv('REDIRECT_URI')
 LOCAL_DEVICE_ID = os.getenv('LOCAL_DEVICE_ID')
 DRIVE_LETTER = os.getenv('DRIVE_LETTER', 'F')  # Default to 'F' if not set
+FLOPPY_MOUNT_PATH = os.getenv('FLOPPY_MOUNT_PATH')  # e.g. /media/floppy; takes precedence over DRIVE_LETTER
+FLOPPY_DRIVES = os.getenv('FLOPPY_DRIVES', '')  # Jukebox mode, e.g. /media/fd0=<device id>,/media/fd1=<device id>
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()  # DEBUG also shows periodic status lines
+LOG_FILE = os.getenv('LOG_FILE', os.path.join('logs', 'floppify.log'))  # Empty to disable the file log
+LOG_FILE_MAX_BYTES = int(os.getenv('LOG_FILE_MAX_BYTES', 1024 * 1024))
+LOG_FILE_BACKUPS = int(os.getenv('LOG_FILE_BACKUPS', 5))
+DISK_WATCHER = os.getenv('DISK_WATCHER', 'auto')  # 'auto' (mount events where available) or 'poll'
+COVER_CACHE_DIR = os.getenv('COVER_CACHE_DIR', os.path.join('cache', 'covers'))
+CATALOG_PATH = os.getenv('CATALOG_PATH', os.path.join('cache', 'catalog.db'))
+COVER_CACHE_MAX_BYTES = int(os.getenv('COVER_CACHE_MAX_BYTES', 20 * 1024 * 1024))  # 20 MB on disk
+METADATA_CACHE_TTL = float(os.getenv('METADATA_CACHE_TTL', 7 * 24 * 3600))  # Seconds a looked-up name/cover is reused
+SPOTIFY_API_PREFIX = os.getenv('SPOTIFY_API_PREFIX', 'https://api.spotify.com/v1/')  # Override to test against a stand-in API
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', 5))  # Seconds per HTTP request
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 3))
+API_RATE_LIMIT = float(os.getenv('API_RATE_LIMIT', 5))  # Sustained Spotify API requests per second
+API_RATE_BURST = int(os.getenv('API_RATE_BURST', 30))  # Enough for a disk's lookups to go out at once
+RECONCILE_POLICY = os.getenv('RECONCILE_POLICY', 'accept')  # 'accept' or 'enforce' external volume/shuffle/repeat changes
+TOKEN_REFRESH_MARGIN = float(os.getenv('TOKEN_REFRESH_MARGIN', 300))  # Refresh this many seconds before expiry
+PLAYBACK_SNAPSHOT_TTL = float(os.getenv('PLAYBACK_SNAPSHOT_TTL', 0.5))  # Seconds a current_playback() result is reused
+PLAYBACK_POLL_PLAYING = float(os.getenv('PLAYBACK_POLL_PLAYING', 10))  # Seconds between polls mid-track
+PLAYBACK_POLL_IDLE = float(os.getenv('PLAYBACK_POLL_IDLE', 30))  # Seconds between polls when paused or stopped
+PLAYBACK_POLL_BURST = float(os.getenv('PLAYBACK_POLL_BURST', 0.5))  # Seconds between polls just after a user action
+PLAYBACK_POLL_BURST_WINDOW = float(os.getenv('PLAYBACK_POLL_BURST_WINDOW', 3))  # Seconds the burst lasts
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))  # Serve Prometheus metrics on 127.0.0.1:<port>; 0 disables
+METRICS_LOG_INTERVAL = float(os.getenv('METRICS_LOG_INTERVAL', 300))  # Seconds between metric summaries in LOG_FILE; 0 disables
 
 # ----------------------------
-# Initialize Log Queue
+# Logging
 # ----------------------------
 log_queue = queue.Queue()
 
-def log_message(message):
+# Playback state deltas posted by the PlaybackStateMonitor for the GUI
+state_queue = queue.Queue()
+
+# Cleared in headless mode, where nothing would ever drain log_queue
+gui_log_enabled = True
+
+logger = logging.getLogger('floppify')
+
+class GUILogHandler(logging.Handler):
+    """Enqueues formatted log messages for the GUI's log panel."""
+
+    def emit(self, record):
+        if gui_log_enabled:
+            log_queue.put(self.format(record))
+
+def skip_file_only(record):
+    """Handler filter that keeps records logged with file_only=True out of the console and GUI."""
+    return not getattr(record, 'file_only', False)
+
+def setup_logging():
     """
-    Logs a message by printing it to the console and enqueueing it for the GUI.
+    Sends log records to the console, the GUI log panel and a rotating log
+    file. The file is written by a background listener thread so callers
+    never wait on disk I/O.
+    """
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter('%(message)s'))
+    console_handler.addFilter(skip_file_only)
+    logger.addHandler(console_handler)
+    gui_handler = GUILogHandler()
+    gui_handler.addFilter(skip_file_only)
+    logger.addHandler(gui_handler)
+    if LOG_FILE:
+        try:
+            if os.path.dirname(LOG_FILE):
+                os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                LOG_FILE, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS, encoding='utf-8')
+        except OSError as e:
+            logger.warning(f"File logging disabled: {e}")
+            return
+        file_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s [%(threadName)s] %(message)s'))
+        file_queue = queue.SimpleQueue()
+        logger.addHandler(logging.handlers.QueueHandler(file_queue))
+        listener = logging.handlers.QueueListener(file_queue, file_handler)
+        listener.start()
+        atexit.register(listener.stop)
+
+setup_logging()
+
+def log_message(message, *args, level=logging.INFO, file_only=False):
+    """
+    Logs a message to the console, the GUI and the log file, or only to the
+    log file with file_only=True. Pass %-style args to have formatting
+    skipped entirely when the level is filtered out.
+    """
+    logger.log(level, message, *args, extra={'file_only': file_only})
+
+# Set by the GUI to show error dialogs; headless mode only logs errors
+error_handler = None
+
+def report_error(title, message):
+    """
+    Logs an error and, when the GUI is running, shows it in a dialog. Safe to
+    call from any thread.
+    """
+    log_message(f"{title}: {message}", level=logging.ERROR)
+    if error_handler:
+        error_handler(title, message)
+
+# ----------------------------
+# Startup Profiler
+# ----------------------------
+
+class StartupProfiler:
     """
-    print(message)  # Print to console
-    log_queue.put(message)  # Enqueue for GUI
+    Records the cold-start timeline (import, auth, devices, asset load, first
+    paint) as spans relative to process start, so startup regressions can be
+    printed or exported and compared between builds.
+    """
+
+    def __init__(self, origin=STARTUP_T0):
+        self.origin = origin
+        self.events = []  # (name, start seconds, end seconds, thread name)
+        self._lock = threading.Lock()
+        self._waiting = set()
+        self._on_complete = None
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, start, time.perf_counter())
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self._record(name, now, now)
+
+    def on_complete(self, names, callback):
+        """Calls callback once every named event has been recorded."""
+        with self._lock:
+            self._waiting = set(names) - {event[0] for event in self.events}
+            self._on_complete = callback
+        self._record(None, 0, 0)
+
+    def _record(self, name, start, end):
+        callback = None
+        with self._lock:
+            if name is not None:
+                self.events.append((name, start - self.origin, end - self.origin, threading.current_thread().name))
+                self._waiting.discard(name)
+            if not self._waiting and self._on_complete:
+                callback, self._on_complete = self._on_complete, None
+        if callback:
+            callback()
+
+    def report(self):
+        with self._lock:
+            events = sorted(self.events, key=lambda event: event[1])
+        lines = ["Startup timeline:"]
+        for name, start, end, thread in events:
+            lines.append(f"  {name:<12} {start * 1000:8.1f} -> {end * 1000:8.1f} ms "
+                         f"({(end - start) * 1000:7.1f} ms) [{thread}]")
+        return '\n'.join(lines)
+
+    def export(self, path):
+        with self._lock:
+            events = [{'name': name, 'start_ms': round(start * 1000, 3), 'end_ms': round(end * 1000, 3),
+                       'thread': thread} for name, start, end, thread in self.events]
+        with open(path, 'w') as f:
+            json.dump({'events': events}, f, indent=2)
+
+startup_profiler = StartupProfiler()
+
+# ----------------------------
+# Metrics
+# ----------------------------
+
+class Histogram:
+    """Cumulative latency histogram with fixed buckets, in seconds."""
+
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Estimates a quantile as the upper bound of the bucket it falls in."""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+class Metrics:
+    """
+    In-process registry of latency histograms and counters, keyed by metric
+    name and labels. Rendered in Prometheus text format for the metrics
+    endpoint and summarised periodically in the log.
+    """
+
+    def __init__(self):
+        self._histograms = {}  # (name, labels) -> Histogram
+        self._counters = {}  # (name, labels) -> int
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def observe(self, name, seconds, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """
+        Times the block (or decorated function) into the `<name>_seconds`
+        histogram; exceptions also count towards `<name>_errors_total`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.inc(f"{name}_errors_total", error=getattr(e, 'http_status', None) or type(e).__name__, **labels)
+            raise
+        finally:
+            self.observe(f"{name}_seconds", time.perf_counter() - start, **labels)
+
+    @staticmethod
+    def _format_labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{key}="{value}"' for key, value in pairs) + '}'
+
+    def render_prometheus(self):
+        with self._lock:
+            histograms = sorted((key, (list(h.counts), h.count, h.sum, h.buckets)) for key, h in self._histograms.items())
+            counters = sorted(self._counters.items())
+        lines = []
+        declared = set()
+        for (name, labels), (counts, count, total, buckets) in histograms:
+            name = f"floppify_{name}"
+            if name not in declared:
+                lines.append(f"# TYPE {name} histogram")
+                declared.add(name)
+            cumulative = 0
+            for bound, bucket_count in zip(buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{name}_bucket{self._format_labels(labels, [('le', le)])} {cumulative}")
+            lines.append(f"{name}_sum{self._format_labels(labels)} {total}")
+            lines.append(f"{name}_count{self._format_labels(labels)} {count}")
+        for (name, labels), value in counters:
+            name = f"floppify_{name}"
+            if name not in declared:
+                lines.append(f"# TYPE {name} counter")
+                declared.add(name)
+            lines.append(f"{name}{self._format_labels(labels)} {value}")
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        """One line per histogram and counter, for the periodic log summary."""
+        with self._lock:
+            histograms = sorted((key, h.count, h.sum, h.quantile(0.95)) for key, h in self._histograms.items())
+            counters = sorted(self._counters.items())
+        lines = ["Metrics summary:"]
+        for (name, labels), count, total, p95 in histograms:
+            lines.append(f"  {name}{self._format_labels(labels)}: n={count} "
+                         f"mean={total / count * 1000:.1f} ms p95<={p95 * 1000:.0f} ms")
+        for (name, labels), value in counters:
+            lines.append(f"  {name}{self._format_labels(labels)}: {value}")
+        return '\n'.join(lines)
+
+metrics = Metrics()
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Serves GET /metrics in Prometheus text format."""
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = metrics.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes would otherwise flood the console
+
+def start_metrics_services(port=METRICS_PORT, log_interval=METRICS_LOG_INTERVAL):
+    """Starts the localhost metrics endpoint and the periodic log summary, as configured."""
+    if port:
+        try:
+            server = ThreadingHTTPServer(('127.0.0.1', port), MetricsRequestHandler)
+        except OSError as e:
+            log_message(f"Metrics endpoint disabled: {e}", level=logging.WARNING)
+        else:
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+            log_message(f"Serving metrics on http://127.0.0.1:{server.server_port}/metrics")
+    if log_interval > 0 and LOG_FILE:
+        def log_summary():
+            while True:
+                time.sleep(log_interval)
+                # File only: the multi-line block would crowd out the GUI log panel
+                log_message(metrics.summary(), file_only=True)
+        threading.Thread(target=log_summary, name='metrics-summary', daemon=True).start()
+
+# ----------------------------
+# Shared HTTP Transport
+# ----------------------------
+
+class TokenBucket:
+    """
+    Global token-bucket rate limiter. acquire() blocks until a request may be
+    sent; pause() holds every caller back, e.g. for a 429's Retry-After.
+    Priority callers only wait out a pause: they take their token straight
+    away, even into debt, so background traffic pays for them afterwards.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, priority=False):
+        start = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.paused_until and (priority or self.tokens >= 1):
+                    self.tokens -= 1
+                    metrics.observe('rate_limit_wait_seconds', now - start)
+                    return
+                delay = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+class HTTPTransport(requests.Session):
+    """
+    Keep-alive session shared by all Spotify API, OAuth and cover traffic. Adds
+    a default timeout, rate limits the Spotify API host through a token bucket
+    (player commands such as play and pause jump the queue), and retries
+    429s, 5xx responses and connection errors with jittered exponential
+    backoff that honours Retry-After.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    PRIORITY_PATH = '/me/player'  # Writes here are user actions and skip the token queue
+    IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS')
+    MAX_RETRY_AFTER = 30.0  # Longer waits are surfaced to the caller instead
+
+    def __init__(self, timeout=HTTP_TIMEOUT, max_retries=HTTP_MAX_RETRIES, rate_limiter=None,
+                 rate_limited_hosts=(urlsplit(SPOTIFY_API_PREFIX).hostname,), pool_size=10, backoff=0.5):
+        super().__init__()
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter
+        self.rate_limited_hosts = set(rate_limited_hosts)
+        self.backoff = backoff
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        limited = self.rate_limiter is not None and urlsplit(url).hostname in self.rate_limited_hosts
+        idempotent = method.upper() in self.IDEMPOTENT_METHODS
+        priority = method.upper() != 'GET' and self.PRIORITY_PATH in urlsplit(url).path
+        attempt = 0
+        while True:
+            if limited:
+                self.rate_limiter.acquire(priority)
+            try:
+                response = super().request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+                time.sleep(self.backoff_delay(attempt))
+                attempt += 1
+                continue
+
+            status = response.status_code
+            metrics.inc('http_responses_total', host=urlsplit(url).hostname, status=status)
+            retryable = status == 429 or (status in self.RETRY_STATUSES and idempotent)
+            if not retryable or attempt >= self.max_retries:
+                return response
+            delay = self.retry_after(response)
+            if delay is None:
+                delay = self.backoff_delay(attempt)
+            elif delay > self.MAX_RETRY_AFTER:
+                return response
+            metrics.inc('http_retries_total', host=urlsplit(url).hostname, status=status)
+            if status == 429 and limited:
+                # Slow every caller down, not just this one
+                self.rate_limiter.pause(delay)
+            log_message(f"HTTP {status} from {urlsplit(url).hostname}, retrying in {delay:.1f}s")
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def backoff_delay(self, attempt):
+        """Full-jitter exponential backoff."""
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    @staticmethod
+    def retry_after(response):
+        """Parses a Retry-After header (seconds or HTTP date) into seconds."""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+api_rate_limiter = TokenBucket(API_RATE_LIMIT, API_RATE_BURST)
+http_session = HTTPTransport(rate_limiter=api_rate_limiter)
 
 # ----------------------------
 # Spotify Authentication Setup
@@ -49,6 +507,75 @@ if not all([CLIENT_ID, CLIENT_SECRET, REDIRECT_URI, LOCAL_DEVICE_ID]):
     log_message(f"Missing environment variables: {', '.join(missing)}")
     raise EnvironmentError(f"Please set the missing environment variables in the .env file: {', '.join(missing)}")
 
+class AtomicCacheFileHandler(CacheFileHandler):
+    """Token cache that is written to a temp file and renamed, so it is never left half-written."""
+
+    def save_token_to_cache(self, token_info):
+        tmp_path = f"{self.cache_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(token_info, cls=self.encoder_cls))
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            log_message(f"Couldn't write token to cache at {self.cache_path}: {e}")
+
+class TokenKeeper:
+    """
+    Auth manager handed to the Spotify client. It returns the current access
+    token without locking and refreshes it on a background thread ahead of
+    expiry, so no API call on a hot path ever waits on a token refresh.
+    """
+
+    def __init__(self, oauth, margin=TOKEN_REFRESH_MARGIN):
+        self.oauth = oauth
+        self.margin = margin
+        self.token_info = None  # Replaced wholesale, so readers never need a lock
+        self._refresh_lock = threading.Lock()
+        self._wake = threading.Event()
+
+    def set_token(self, token_info):
+        self.token_info = token_info
+        self._wake.set()
+
+    def get_access_token(self, as_dict=False):
+        token_info = self.token_info
+        if token_info is None or token_info['expires_at'] <= time.time():
+            # Only reached before start-up auth or after the machine slept through a refresh
+            token_info = self.refresh()
+        return token_info if as_dict else token_info['access_token']
+
+    def refresh(self):
+        with self._refresh_lock:
+            token_info = self.token_info
+            if token_info is None:
+                token_info = self.oauth.validate_token(self.oauth.cache_handler.get_cached_token())
+                if token_info is None:
+                    raise spotipy.oauth2.SpotifyOauthError("Not authenticated with Spotify yet.")
+            if token_info['expires_at'] - time.time() <= self.margin:
+                token_info = self.oauth.refresh_access_token(token_info['refresh_token'])
+            self.token_info = token_info
+            return token_info
+
+    def start(self):
+        threading.Thread(target=self._refresh_loop, daemon=True).start()
+
+    def _refresh_loop(self):
+        while True:
+            token_info = self.token_info
+            if token_info is None:
+                delay = None
+            else:
+                delay = max(0.0, token_info['expires_at'] - self.margin - time.time())
+            self._wake.wait(delay)
+            self._wake.clear()
+            try:
+                if self.token_info is not None:
+                    self.refresh()
+            except Exception as e:
+                log_message(f"Error refreshing Spotify token: {e}")
+                self._wake.wait(30)  # Retry shortly; the current token is still valid for a while
+
 # Set up Spotify authentication
 sp_oauth = SpotifyOAuth(
     client_id=CLIENT_ID,
@@ -56,10 +583,124 @@ sp_oauth = SpotifyOAuth(
     redirect_uri=REDIRECT_URI,
     scope='user-modify-playback-state user-read-playback-state user-read-currently-playing',
     open_browser=True,
-    show_dialog=True  # Force login screen
+    show_dialog=True,  # Force login screen
+    requests_session=http_session,
+    requests_timeout=HTTP_TIMEOUT,
+    cache_handler=AtomicCacheFileHandler()
 )
 
-sp = spotipy.Spotify(auth_manager=sp_oauth)
+token_keeper = TokenKeeper(sp_oauth)
+class InstrumentedSpotify(spotipy.Spotify):
+    """Spotify client whose wrapper calls are timed into spotify_call_seconds{call=...}."""
+
+    TIMED_CALLS = ('current_playback', 'devices', 'start_playback', 'pause_playback', 'transfer_playback',
+                   'volume', 'shuffle', 'repeat', 'next_track', 'previous_track', 'queue',
+                   'playlist', 'album', 'track', 'artist', 'audio_analysis')
+
+def _timed_spotify_call(name):
+    call = getattr(spotipy.Spotify, name)
+
+    @functools.wraps(call)
+    def timed(self, *args, **kwargs):
+        with metrics.timer('spotify_call', call=name):
+            return call(self, *args, **kwargs)
+    return timed
+
+for _name in InstrumentedSpotify.TIMED_CALLS:
+    setattr(InstrumentedSpotify, _name, _timed_spotify_call(_name))
+
+sp = InstrumentedSpotify(auth_manager=token_keeper, requests_session=http_session, requests_timeout=HTTP_TIMEOUT)
+sp.prefix = SPOTIFY_API_PREFIX
+
+# ----------------------------
+# Device Registry
+# ----------------------------
+
+class DeviceRegistry:
+    """
+    Cache of the account's Spotify Connect devices. It is filled at startup
+    and refreshed only when playback reports a missing device (404), since
+    the playback fast path never needs the list.
+    """
+
+    def __init__(self):
+        self.updated = None  # monotonic time of the last successful refresh
+        self._devices = {}
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Fetches the device list from Spotify and returns it."""
+        devices = sp.devices()['devices']
+        with self._lock:
+            self._devices = {device['id']: device for device in devices}
+            self.updated = time.monotonic()
+        return devices
+
+    def devices(self):
+        with self._lock:
+            loaded = self.updated is not None
+        if not loaded:
+            return self.refresh()
+        with self._lock:
+            return list(self._devices.values())
+
+    def get(self, device_id):
+        """Returns the cached device with this ID, or None."""
+        for device in self.devices():
+            if device['id'] == device_id:
+                return device
+        return None
+
+device_registry = DeviceRegistry()
+
+# ----------------------------
+# Playback Snapshot
+# ----------------------------
+
+class PlaybackSnapshot:
+    """
+    Short TTL cache of current_playback(). Any successful write invalidates
+    it and notifies write_listeners, so the next read fetches fresh state.
+    """
+
+    def __init__(self, ttl=PLAYBACK_SNAPSHOT_TTL):
+        self.ttl = ttl
+        self._value = None
+        self._fetched_at = None  # time.monotonic() of the cached value; None when there is none
+        self._generation = 0  # Bumped by writes, so a fetch that raced one isn't cached
+        self._lock = threading.Lock()
+        self.write_listeners = []  # Called after every write, e.g. to poll sooner
+
+    def get(self, max_age=None):
+        """Returns current_playback(), fetching only if the snapshot is older than max_age (default: the TTL)."""
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            if self._fetched_at is not None and time.monotonic() - self._fetched_at <= max_age:
+                metrics.inc('playback_snapshot_total', result='hit')
+                return self._value
+            generation = self._generation
+        metrics.inc('playback_snapshot_total', result='fetch')
+        playback = sp.current_playback()
+        with self._lock:
+            if self._generation == generation:
+                self._value, self._fetched_at = playback, time.monotonic()
+        return playback
+
+    def invalidate(self):
+        """Drops the snapshot after a successful write."""
+        with self._lock:
+            self._generation += 1
+            self._fetched_at = None
+        for listener in self.write_listeners:
+            listener()
+
+    @property
+    def fetched_at(self):
+        """time.monotonic() at which the current snapshot was fetched (now if there is none)."""
+        with self._lock:
+            return self._fetched_at if self._fetched_at is not None else time.monotonic()
+
+playback_snapshot = PlaybackSnapshot()
 
 # ----------------------------
 # Spotify Control Functions
@@ -67,56 +708,47 @@ sp = spotipy.Spotify(auth_manager=sp_oauth)
 
 # Function to authenticate with Spotify
 def authenticate_spotify():
-    token_info = sp_oauth.get_cached_token()
+    token_info = sp_oauth.validate_token(sp_oauth.cache_handler.get_cached_token())
     if not token_info:
-        auth_url = sp_oauth.get_authorize_url()
-        log_message(f"Please navigate here: {auth_url}")
-        import webbrowser
-        webbrowser.open(auth_url, new=1)
-        # Wait for user to authorize and get the response
-        while True:
-            try:
-                token_info = sp_oauth.get_access_token(as_dict=False)
-                break
-            except:
-                time.sleep(1)
-    else:
-        sp_oauth.validate_token(token_info)
+        log_message(f"Please navigate here: {sp_oauth.get_authorize_url()}")
+        # Opens the browser and waits for the redirect on the local callback server
+        code = sp_oauth.get_auth_response()
+        token_info = sp_oauth.get_access_token(code, as_dict=True, check_cache=False)
+    token_keeper.set_token(token_info)
+    token_keeper.start()
 
 # Function to list available devices
 def list_devices():
-    devices = sp.devices()
+    devices = device_registry.refresh()
     log_message("Available devices:")
-    for device in devices['devices']:
+    for device in devices:
         log_message(f"Name: {device['name']}, ID: {device['id']}, Type: {device['type']}")
 
 # Function to check if the local device is available
 def is_device_available(device_id):
-    devices = sp.devices()
-    for device in devices['devices']:
-        if device['id'] == device_id:
-            return True
-    return False
-
-# Function to check if the floppy disk is inserted
-def is_floppy_disk_inserted(drive_letter):
-    filepath = f'{drive_letter}:\\playlist.txt'
-    return os.path.exists(filepath)
-
-# Function to read the Spotify URIs or URLs from the floppy disk and select one at random
-def get_spotify_uri_from_floppy(drive_letter):
-    filepath = f'{drive_letter}:\\playlist.txt'
+    return device_registry.get(device_id) is not None
+
+# Function to build the path of a file on the floppy (drive letter or mount path)
+def floppy_path(drive, filename):
+    if len(drive) == 1:
+        return f'{drive}:\\{filename}'
+    return os.path.join(drive, filename)
+
+# Function to get a cheap stat signature of playlist.txt (None when no disk is inserted)
+@metrics.timer('floppy_io', op='playlist_signature')
+def playlist_signature(drive):
+    if is_raw_drive(drive):
+        volume = open_raw_volume(drive)
+        if volume is None:
+            return None
+        with volume:
+            entry = volume.find('playlist.txt')
+            return (volume.serial,) + entry if entry else None
     try:
-        with open(filepath, 'r') as f:
-            lines = f.readlines()
-            lines = [line.strip() for line in lines if line.strip()]
-            if lines:
-                uri_or_url = random.choice(lines)  # Select one at random
-                return uri_or_url
-            else:
-                return None
-    except FileNotFoundError:
+        stat = os.stat(floppy_path(drive, 'playlist.txt'))
+    except OSError:
         return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
 
 # Function to parse Spotify URI or URL
 def parse_spotify_uri(uri_or_url):
@@ -130,109 +762,789 @@ def parse_spotify_uri(uri_or_url):
             return f'spotify:{uri_type}:{uri_id}'
     return None
 
-# Function to get the Spotify item's name
-def get_spotify_item_name(uri):
-    try:
-        uri_parts = uri.split(':')
-        if len(uri_parts) < 3:
-            return None
-        uri_type = uri_parts[1]
-        uri_id = uri_parts[2]
-        if uri_type == 'playlist':
-            playlist = sp.playlist(uri_id)
-            return f"Playlist: {playlist['name']}"
-        elif uri_type == 'album':
-            album = sp.album(uri_id)
-            return f"Album: {album['name']}"
-        elif uri_type == 'track':
-            track = sp.track(uri_id)
-            return f"Track: {track['name']}"
-        elif uri_type == 'artist':
-            artist = sp.artist(uri_id)
-            return f"Artist: {artist['name']}"
-        else:
-            return None
-    except Exception as e:
-        log_message(f"Error getting item name: {e}")
+# Function to fetch the Spotify item's display name and cover URL, cached (raises on API errors)
+def fetch_spotify_item_info(uri):
+    info = metadata_cache.get(uri)
+    if info is None:
+        info = request_spotify_item_info(uri)
+        if info:
+            metadata_cache.put(uri, info)
+    return info
+
+# Function to look up the Spotify item's display name and cover URL, asking only for the fields used
+def request_spotify_item_info(uri):
+    uri_parts = uri.split(':')
+    if len(uri_parts) < 3:
         return None
+    uri_type = uri_parts[1]
+    uri_id = uri_parts[2]
+    if uri_type == 'playlist':
+        # Without a field filter this returns the first 100 tracks with full album and artist objects
+        item = sp.playlist(uri_id, fields='name,images')
+        name = f"Playlist: {item['name']}"
+    elif uri_type == 'album':
+        item = sp.album(uri_id)
+        name = f"Album: {item['name']}"
+    elif uri_type == 'track':
+        item = sp.track(uri_id)
+        name = f"Track: {item['name']}"
+        item = item['album']  # Tracks take their cover from the album
+    elif uri_type == 'artist':
+        item = sp.artist(uri_id)
+        name = f"Artist: {item['name']}"
+    else:
+        return None
+    cover = select_cover_image(item.get('images'))
+    return {'name': name, 'cover_url': cover['url'] if cover else None}
+
+# Function to start playing a URI on a device
+def start_playback_on(device_id, uri):
+    if 'track' in uri:
+        sp.start_playback(device_id=device_id, uris=[uri])
+    else:
+        sp.start_playback(device_id=device_id, context_uri=uri)
 
 # Function to play the Spotify URI on the local device
-def play_spotify_uri(uri):
+def play_spotify_uri(uri, device_id=LOCAL_DEVICE_ID):
     try:
-        device_id = LOCAL_DEVICE_ID
-
-        if not is_device_available(device_id):
-            messagebox.showerror("Device Error", "Local device not available. Please open Spotify on your computer.")
-            return
-
-        # Transfer playback to the local device
-        sp.transfer_playback(device_id=device_id, force_play=True)
-
-        if 'track' in uri:
-            sp.start_playback(device_id=device_id, uris=[uri])
-        else:
-            sp.start_playback(device_id=device_id, context_uri=uri)
+        try:
+            # Fast path: start_playback with a device_id moves playback there in one call
+            start_playback_on(device_id, uri)
+        except spotipy.exceptions.SpotifyException as e:
+            if e.http_status != 404:
+                raise
+            # Device not found: refresh the device list and do the full transfer sequence
+            log_message("Device not found, retrying with a playback transfer...")
+            device_registry.refresh()
+            if not is_device_available(device_id):
+                report_error("Device Error", "Local device not available. Please open Spotify on your computer.")
+                return
+            sp.transfer_playback(device_id=device_id, force_play=False)
+            start_playback_on(device_id, uri)
+        playback_snapshot.invalidate()
         log_message(f"Started playback for URI: {uri}")
     except spotipy.exceptions.SpotifyException as e:
-        log_message(f"Error starting playback: {e}")
-        messagebox.showerror("Playback Error", str(e))
+        report_error("Playback Error", f"Error starting playback: {e}")
 
 # Function to stop Spotify playback
-def stop_playback():
+def stop_playback(device_id=LOCAL_DEVICE_ID):
     try:
         log_message("Stopping playback...")
-        sp.pause_playback(device_id=LOCAL_DEVICE_ID)
+        sp.pause_playback(device_id=device_id)
+        playback_snapshot.invalidate()
         log_message("Playback stopped.")
     except spotipy.exceptions.SpotifyException as e:
-        log_message(f"Error stopping playback: {e}")
-        messagebox.showerror("Playback Error", str(e))
+        report_error("Playback Error", f"Error stopping playback: {e}")
 
-# Function to toggle play/pause
-def toggle_play_pause():
-    try:
-        playback = sp.current_playback()
-        if playback and playback['is_playing']:
-            sp.pause_playback(device_id=LOCAL_DEVICE_ID)
-            log_message("Paused playback.")
-        else:
-            sp.start_playback(device_id=LOCAL_DEVICE_ID)
-            log_message("Resumed playback.")
-    except spotipy.exceptions.SpotifyException as e:
-        log_message(f"Error toggling playback: {e}")
-        messagebox.showerror("Playback Error", str(e))
+# ----------------------------
+# Playback State Monitor
+# ----------------------------
+
+ALBUM_COVER_SIZE = (110, 95)  # Size of the album cover shown over the floppy
+GUI_TICK_MS = 100  # Milliseconds between GUI queue drains
+COVER_PREFETCH_COUNT = 3  # Upcoming queue tracks whose covers are fetched ahead of time
+
+def select_cover_image(images, size=ALBUM_COVER_SIZE):
+    """
+    Picks the smallest Spotify image variant that still covers the display size,
+    falling back to the largest variant available.
+    """
+    if not images:
+        return None
+    sized = [image for image in images if image.get('width') and image.get('height')]
+    if not sized:
+        return images[0]
+    large_enough = [image for image in sized if image['width'] >= size[0] and image['height'] >= size[1]]
+    if large_enough:
+        return min(large_enough, key=lambda image: image['width'] * image['height'])
+    return max(sized, key=lambda image: image['width'] * image['height'])
+
+def extract_playback_state(playback):
+    """
+    Reduces a current_playback() response to the fields the GUI displays.
+    """
+    track = playback['item'] if playback else None
+    shuffle = playback.get('shuffle_state') if playback else None
+    repeat = playback.get('repeat_state') if playback else None
+    if not playback or not playback['is_playing'] or not track:
+        return {
+            'track': 'Not available',
+            'artist': 'Not available',
+            'album': 'Not available',
+            'cover_url': None,
+            'is_playing': False,
+            'volume': None,
+            'shuffle': shuffle,
+            'repeat': repeat,
+        }
+    cover = select_cover_image(track['album']['images'])
+    device = playback.get('device')
+    return {
+        'track': track['name'],
+        'artist': ', '.join([artist['name'] for artist in track['artists']]),
+        'album': track['album']['name'],
+        'cover_url': cover['url'] if cover else None,
+        'is_playing': True,
+        'volume': device['volume_percent'] if device else None,
+        'shuffle': shuffle,
+        'repeat': repeat,
+    }
+
+class PlaybackClock:
+    """
+    Extrapolates the playback position between polls from the last
+    progress_ms, so animations can follow the music smoothly without extra
+    API calls. Updated by the PlaybackStateMonitor; read from any thread.
+    """
 
-# Function to toggle shuffle
-def toggle_shuffle():
+    def __init__(self):
+        # (track_id, progress_ms, duration_ms, is_playing, sampled_at), replaced wholesale so readers need no lock
+        self._sample = (None, 0, 0, False, time.monotonic())
+
+    def update(self, playback, sampled_at):
+        track = playback['item'] if playback else None
+        if not track:
+            self._sample = (None, 0, 0, False, sampled_at)
+            return
+        self._sample = (track.get('id'), playback.get('progress_ms') or 0, track.get('duration_ms') or 0,
+                        bool(playback['is_playing']), sampled_at)
+
+    @property
+    def track_id(self):
+        return self._sample[0]
+
+    @property
+    def is_playing(self):
+        return self._sample[3]
+
+    @property
+    def duration(self):
+        """Track length in seconds (0 when unknown)."""
+        return self._sample[2] / 1000
+
+    def remaining(self, now=None):
+        """Seconds left in the track, or None when its length is unknown."""
+        duration = self.duration
+        return max(0.0, duration - self.position(now)) if duration else None
+
+    def position(self, now=None):
+        """Current position in seconds into the track."""
+        _, progress_ms, duration_ms, is_playing, sampled_at = self._sample
+        position = progress_ms / 1000
+        if is_playing:
+            position += (now if now is not None else time.monotonic()) - sampled_at
+            if duration_ms:
+                position = min(position, duration_ms / 1000)
+        return position
+
+playback_clock = PlaybackClock()
+
+def download_album_cover(url, size=ALBUM_COVER_SIZE):
+    """
+    Downloads and resizes an album cover, returning a PIL image (or None on failure).
+    """
+    from PIL import Image  # Imported lazily: headless mode never decodes covers
     try:
-        playback = sp.current_playback()
-        if playback and 'shuffle_state' in playback:
-            new_shuffle = not playback['shuffle_state']
-            sp.shuffle(new_shuffle, device_id=LOCAL_DEVICE_ID)
-            state = "enabled" if new_shuffle else "disabled"
-            log_message(f"Shuffle {state}.")
-    except spotipy.exceptions.SpotifyException as e:
-        log_message(f"Error toggling shuffle: {e}")
-        messagebox.showerror("Shuffle Error", str(e))
+        with metrics.timer('cover_fetch'):
+            response = http_session.get(url)
+            response.raise_for_status()
+        with metrics.timer('cover_decode', source='download'):
+            # Close each intermediate as soon as it is used, rather than leaving its buffers to the GC
+            with Image.open(BytesIO(response.content)) as source:
+                # Let the JPEG decoder downscale by DCT so full-resolution pixels are never materialised
+                source.draft('RGB', size)
+                converted = source.convert("RGBA")
+            with converted:
+                return converted.resize(size, Image.Resampling.LANCZOS)
+    except Exception as e:
+        log_message(f"Error loading album cover: {e}")
+        return None
+
+class CoverCache:
+    """
+    Album cover cache keyed by image URL. Resized covers are kept in a bounded
+    in-memory LRU and persisted to a content-addressed on-disk store, so each
+    cover is downloaded and decoded only once.
+    """
+
+    def __init__(self, directory=COVER_CACHE_DIR, max_bytes=COVER_CACHE_MAX_BYTES, memory_size=32):
+        self.directory = directory
+        self.objects_dir = os.path.join(directory, 'objects')
+        self.index_path = os.path.join(directory, 'index.json')
+        self.max_bytes = max_bytes
+        self.memory_size = memory_size
+        self._memory = OrderedDict()  # key -> PIL image, least recently used first
+        self._lock = threading.Lock()
+        self._index = self._load_index()  # key -> sha256 of the stored PNG
+
+    @staticmethod
+    def cache_key(url, size):
+        return f"{url}@{size[0]}x{size[1]}"
+
+    def get(self, url, size=ALBUM_COVER_SIZE):
+        """Returns the resized cover for url, downloading it only on a full miss."""
+        img = self.peek(url, size)
+        if img is not None:
+            return img
+        metrics.inc('cover_cache_lookups_total', result='miss')
+        img = download_album_cover(url, size)
+        if img is None:
+            return None
+        key = self.cache_key(url, size)
+        self._store_on_disk(key, img)
+        self._remember(key, img)
+        return img
+
+    def peek(self, url, size=ALBUM_COVER_SIZE):
+        """Returns the cover for url from memory or disk, or None without downloading it."""
+        key = self.cache_key(url, size)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                metrics.inc('cover_cache_lookups_total', result='memory')
+                return self._memory[key]
+        img = self._load_from_disk(key)
+        if img is not None:
+            metrics.inc('cover_cache_lookups_total', result='disk')
+            self._remember(key, img)
+        return img
+
+    def _remember(self, key, img):
+        with self._lock:
+            self._memory[key] = img
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.png")
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_index(self):
+        # Caller holds self._lock. Write atomically so a crash never truncates the index.
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _load_from_disk(self, key):
+        from PIL import Image
+        with self._lock:
+            digest = self._index.get(key)
+        if not digest:
+            return None
+        path = self._object_path(digest)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # Mark as recently used for eviction
+            with metrics.timer('cover_decode', source='disk'):
+                img = Image.open(BytesIO(data))
+                img.load()
+            return img
+        except Exception:
+            with self._lock:
+                self._index.pop(key, None)
+            return None
+
+    def _store_on_disk(self, key, img):
+        try:
+            buffer = BytesIO()
+            img.save(buffer, format='PNG')
+            data = buffer.getvalue()
+            digest = hashlib.sha256(data).hexdigest()
+            path = self._object_path(digest)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            with self._lock:
+                self._index[key] = digest
+                self._evict()
+                self._save_index()
+        except Exception as e:
+            log_message(f"Error caching album cover: {e}")
+
+    def _evict(self):
+        """Removes least recently used objects until the store fits in max_bytes."""
+        objects = []
+        total = 0
+        for root, _, files in os.walk(self.objects_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                objects.append((stat.st_mtime, stat.st_size, name[:-len('.png')], path))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        objects.sort()
+        evicted = set()
+        for _, file_size, digest, path in objects:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= file_size
+            evicted.add(digest)
+        self._index = {key: digest for key, digest in self._index.items() if digest not in evicted}
+
+cover_cache = CoverCache()
+
+class CoverPrefetcher(threading.Thread):
+    """
+    Fetches and decodes the covers of the next few queued tracks into the cover
+    cache, so a track change can show its cover in the same frame as its title.
+    """
+
+    def __init__(self, cache=cover_cache, count=COVER_PREFETCH_COUNT):
+        super().__init__(daemon=True)
+        self.cache = cache
+        self.count = count
+        self._wake = threading.Event()
 
-# Function to toggle loop (repeat)
-def toggle_loop():
+    def request(self):
+        """Asks the worker to refresh its prefetch (called on every track change)."""
+        self._wake.set()
+
+    def run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                upcoming = sp.queue().get('queue') or []
+            except Exception as e:
+                log_message(f"Error fetching queue for cover prefetch: {e}")
+                continue
+            for item in upcoming[:self.count]:
+                album = item.get('album') if item else None
+                cover = select_cover_image(album['images']) if album else None
+                if cover:
+                    self.cache.get(cover['url'])
+
+class PlaybackStateMonitor(threading.Thread):
+    """
+    Polls Spotify on a background thread and posts only the changed playback
+    fields to state_queue, so the GUI never blocks on the network. Covers that
+    are not cached yet are downloaded off the poll thread and posted in a
+    later delta, so a slow cover never holds up the title. Polls are
+    scheduled predictively: rarely mid-track or when idle, just after the
+    track is expected to end, and in a short burst after any player command.
+    """
+
+    TRACK_END_MARGIN = 0.3  # Seconds after the expected end of a track to poll for the next one
+    MIN_INTERVAL = 1.0  # Floor once the expected track end has passed without a change
+
+    def __init__(self, playing_interval=PLAYBACK_POLL_PLAYING, idle_interval=PLAYBACK_POLL_IDLE,
+                 burst_interval=PLAYBACK_POLL_BURST, burst_window=PLAYBACK_POLL_BURST_WINDOW,
+                 prefetcher=None, reconciler=None, clock=None):
+        super().__init__(daemon=True)
+        self.playing_interval = playing_interval
+        self.idle_interval = idle_interval
+        self.burst_interval = burst_interval
+        self.burst_window = burst_window
+        self.prefetcher = prefetcher
+        self.reconciler = reconciler
+        self.clock = clock or playback_clock
+        self.state = {}
+        self.burst_until = 0.0
+        self._stop_event = threading.Event()
+        self._wake = threading.Event()
+        self._cover_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix='cover')
+        playback_snapshot.write_listeners.append(self.nudge)
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.poll()
+            deadline = time.monotonic() + self.next_interval()
+            while not self._stop_event.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if self._wake.wait(remaining):
+                    # A command was sent: pull the next poll in, but give Spotify a moment to apply it
+                    self._wake.clear()
+                    deadline = min(deadline, time.monotonic() + self.burst_interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+
+    def nudge(self):
+        """Polls frequently for a short while, so the effect of a user action shows up quickly."""
+        self.burst_until = time.monotonic() + self.burst_window
+        self._wake.set()
+
+    def next_interval(self):
+        now = time.monotonic()
+        if now < self.burst_until:
+            return self.burst_interval
+        if not self.clock.is_playing:
+            return self.idle_interval
+        remaining = self.clock.remaining(now)
+        if remaining is None:
+            return self.playing_interval
+        if remaining <= 0:
+            return self.MIN_INTERVAL
+        # Wake just after the track should end to pick up the next one
+        return min(self.playing_interval, remaining + self.TRACK_END_MARGIN)
+
+    def poll(self):
+        try:
+            playback = playback_snapshot.get()
+        except Exception as e:
+            log_message(f"Error polling playback state: {e}")
+            return
+        self.clock.update(playback, playback_snapshot.fetched_at)
+        new_state = extract_playback_state(playback)
+        delta = {key: value for key, value in new_state.items()
+                 if key not in self.state or self.state[key] != value}
+        if 'cover_url' in delta:
+            # A cached (usually prefetched) cover arrives in the same delta as the new title;
+            # otherwise the title goes out now and the cover follows once it has downloaded
+            url = delta['cover_url']
+            delta['cover_image'] = cover_cache.peek(url) if url else None
+            if url and delta['cover_image'] is None:
+                self._cover_worker.submit(self.fetch_cover, url)
+        self.state = new_state
+        if delta:
+            state_queue.put(delta)
+        if self.reconciler:
+            self.reconciler.observe(new_state)
+        if self.prefetcher and 'track' in delta and new_state['is_playing']:
+            self.prefetcher.request()
+
+    def fetch_cover(self, url):
+        """Downloads a cover that missed the cache and posts it if the track hasn't moved on."""
+        try:
+            img = cover_cache.get(url)
+        except Exception as e:
+            log_message(f"Error fetching album cover: {e}")
+            return
+        if img is not None and self.state.get('cover_url') == url:
+            state_queue.put({'cover_image': img})
+
+# ----------------------------
+# Command Dispatcher
+# ----------------------------
+
+# Function to get the next repeat state in the off -> context -> track cycle
+def next_repeat_state(current_state):
+    if current_state == "off":
+        return "context"  # Loop the playlist
+    elif current_state == "context":
+        return "track"    # Loop the current track
+    return "off"          # Disable looping
+
+class CommandDispatcher(threading.Thread):
+    """
+    Runs player commands on a worker thread so button clicks never block Tk.
+    Commands that pile up while the worker is busy are coalesced: the last
+    volume, play state, shuffle or repeat value wins and skips add up into one
+    sequence. If a command fails, its on_error callback receives the exception
+    so the caller can roll back its optimistic UI update. In jukebox mode the
+    DriveManager retargets device_id at whichever drive is playing.
+    """
+
+    def __init__(self, device_id=LOCAL_DEVICE_ID):
+        super().__init__(daemon=True)
+        self.device_id = device_id
+        self._pending = OrderedDict()  # kind -> [value, on_error]
+        self._condition = threading.Condition()
+
+    def submit(self, kind, value=None, on_error=None):
+        """Queues a command: 'volume', 'play', 'shuffle', 'repeat' or 'skip' (+n / -n)."""
+        with self._condition:
+            pending = self._pending.get(kind)
+            if pending is None:
+                self._pending[kind] = [value, on_error]
+            elif kind == 'skip':
+                pending[0] += value
+            else:
+                # Keep the first on_error: it rolls back to the state before the burst
+                pending[0] = value
+            self._condition.notify()
+
+    def run(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                batch = list(self._pending.items())
+                self._pending.clear()
+            for kind, (value, on_error) in batch:
+                try:
+                    self.execute(kind, value)
+                    playback_snapshot.invalidate()
+                except Exception as e:
+                    log_message(f"Error running {kind} command: {e}")
+                    if on_error:
+                        on_error(e)
+
+    def execute(self, kind, value):
+        if kind == 'volume':
+            sp.volume(value, device_id=self.device_id)
+            log_message(f"Volume set to {value}%")
+        elif kind == 'play':
+            if value:
+                sp.start_playback(device_id=self.device_id)
+                log_message("Resumed playback.")
+            else:
+                sp.pause_playback(device_id=self.device_id)
+                log_message("Paused playback.")
+        elif kind == 'shuffle':
+            sp.shuffle(value, device_id=self.device_id)
+            log_message(f"Shuffle {'enabled' if value else 'disabled'}.")
+        elif kind == 'repeat':
+            sp.repeat(value, device_id=self.device_id)
+            log_message(f"Loop set to {value}.")
+        elif kind == 'skip':
+            for _ in range(abs(value)):
+                if value > 0:
+                    sp.next_track(device_id=self.device_id)
+                else:
+                    sp.previous_track(device_id=self.device_id)
+
+command_dispatcher = CommandDispatcher()
+
+# ----------------------------
+# Desired-State Reconciler
+# ----------------------------
+
+class PlaybackReconciler(threading.Thread):
+    """
+    Holds the app's desired volume, shuffle, repeat and play state and issues
+    only the writes needed to bring Spotify in line with it. User changes are
+    debounced and written at most once per min_interval per field. A snapshot
+    that disagrees with the desired state outside the settle window after our
+    own write is an external change: the 'accept' policy adopts it, the
+    'enforce' policy writes the desired value back at most every
+    enforce_interval seconds. Play state changes are always accepted.
+    """
+
+    FIELDS = {'volume': 'volume', 'is_playing': 'play', 'shuffle': 'shuffle', 'repeat': 'repeat'}
+
+    def __init__(self, dispatcher=command_dispatcher, policy=RECONCILE_POLICY, debounce=0.3,
+                 min_interval=1.0, settle=3.0, enforce_interval=10.0):
+        super().__init__(daemon=True)
+        self.dispatcher = dispatcher
+        self.policy = policy
+        self.debounce = debounce
+        self.min_interval = min_interval
+        self.settle = settle
+        self.enforce_interval = enforce_interval
+        self.desired = {}
+        self.observed = {}
+        self._on_error = {}
+        self._last_write = {}
+        self._dirty = set()
+        self._deadline = None
+        self._condition = threading.Condition()
+
+    def set_desired(self, field, value, on_error=None):
+        """Records a user change; the write goes out once the debounce settles."""
+        with self._condition:
+            self.desired[field] = value
+            if on_error and field not in self._on_error:
+                self._on_error[field] = on_error
+            self._dirty.add(field)
+            self._deadline = time.monotonic() + self.debounce
+            self._condition.notify()
+
+    def observe(self, state):
+        """Compares a monitored snapshot against the desired state."""
+        accepted = {}
+        now = time.monotonic()
+        with self._condition:
+            for field in self.FIELDS:
+                value = state.get(field)
+                if value is None:
+                    continue
+                self.observed[field] = value
+                desired = self.desired.get(field)
+                if desired is None:
+                    self.desired[field] = value
+                    accepted[field] = value
+                    continue
+                if desired == value or field in self._dirty:
+                    continue
+                if now - self._last_write.get(field, float('-inf')) < self.settle:
+                    continue  # Our own write has not shown up in the snapshot yet
+                if self.policy == 'enforce' and field != 'is_playing':
+                    if now - self._last_write.get(field, float('-inf')) >= self.enforce_interval:
+                        log_message(f"Spotify {field} changed externally to {value}, resetting to {desired}")
+                        self._dirty.add(field)
+                        self._deadline = now
+                else:
+                    self.desired[field] = value
+                    accepted[field] = value
+            self._condition.notify()
+        if accepted:
+            state_queue.put({'accepted': accepted})
+
+    def run(self):
+        while True:
+            with self._condition:
+                while self._deadline is None or time.monotonic() < self._deadline:
+                    timeout = None if self._deadline is None else self._deadline - time.monotonic()
+                    self._condition.wait(timeout)
+                now = time.monotonic()
+                self._deadline = None
+                writes = []
+                for field in list(self._dirty):
+                    next_allowed = self._last_write.get(field, float('-inf')) + self.min_interval
+                    if now < next_allowed:
+                        self._deadline = min(self._deadline or next_allowed, next_allowed)
+                        continue
+                    self._dirty.discard(field)
+                    on_error = self._on_error.pop(field, None)
+                    if self.desired[field] == self.observed.get(field):
+                        continue  # Already there, nothing to write
+                    self._last_write[field] = now
+                    writes.append((field, self.desired[field], on_error))
+            for field, value, on_error in writes:
+                self.dispatcher.submit(self.FIELDS[field], value, on_error=self._failed(field, on_error))
+
+    def _failed(self, field, on_error):
+        """Wraps on_error so a failed write also resets the desired value to what Spotify reports."""
+        def handler(error):
+            with self._condition:
+                if field in self.observed:
+                    self.desired[field] = self.observed[field]
+            if on_error:
+                on_error(error)
+        return handler
+
+playback_reconciler = PlaybackReconciler()
+
+# ----------------------------
+# Raw FAT12 Reader
+# ----------------------------
+
+RAW_IMAGE_SUFFIXES = ('.img', '.ima')
+
+def is_raw_drive(drive):
+    """True for drives read directly as FAT12: a raw device (/dev/fd0) or a disk image file."""
+    return drive.startswith('/dev/') or drive.lower().endswith(RAW_IMAGE_SUFFIXES)
+
+class Fat12Volume:
+    """
+    Read-only view of a FAT12 floppy on a raw device or disk image. The boot
+    sector, FAT and root directory are memory-mapped, so only the pages that
+    are actually touched get read from the disk; a file's data is then read
+    with one seek and read per contiguous run of clusters. The volume serial
+    number from the boot sector identifies the disk without writing to it.
+    """
+
+    DIR_ENTRY_SIZE = 32
+    ATTR_VOLUME_LABEL = 0x08
+    ATTR_DIRECTORY = 0x10
+    ATTR_LONG_NAME = 0x0F
+
+    def __init__(self, path):
+        self._file = open(path, 'rb', buffering=0)  # Binary and unbuffered on every platform
+        try:
+            boot = self._read_at(0, 512)
+            if len(boot) < 512:
+                raise ValueError("no disk or image too short")
+            (self.bytes_per_sector, self.sectors_per_cluster, reserved_sectors, fat_count,
+             root_entries, total_sectors, _, fat_sectors) = struct.unpack_from('<HBHBHHBH', boot, 11)
+            if self.bytes_per_sector not in (512, 1024, 2048, 4096) or not self.sectors_per_cluster or not fat_count:
+                raise ValueError("not a FAT boot sector")
+            self.fat_offset = reserved_sectors * self.bytes_per_sector
+            self.root_offset = self.fat_offset + fat_count * fat_sectors * self.bytes_per_sector
+            self.root_size = root_entries * self.DIR_ENTRY_SIZE
+            self.data_offset = self.root_offset + -(-self.root_size // self.bytes_per_sector) * self.bytes_per_sector
+            self.cluster_size = self.sectors_per_cluster * self.bytes_per_sector
+            self.cluster_count = (total_sectors * self.bytes_per_sector - self.data_offset) // self.cluster_size
+            if self.cluster_count >= 4085:
+                raise ValueError("not a FAT12 volume")
+            if boot[38] == 0x29:  # Extended boot signature: serial number and label present
+                self.serial = '%08X' % struct.unpack_from('<I', boot, 39)[0]
+            else:
+                self.serial = hashlib.sha1(boot).hexdigest()[:8].upper()  # Pre-DOS 4 disks have no serial
+            self._meta = mmap.mmap(self._file.fileno(), self.data_offset, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+    def close(self):
+        self._meta.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def find(self, filename):
+        """Returns the root directory entry for an 8.3 filename as (first_cluster, size, mtime), or None."""
+        base, _, ext = filename.upper().partition('.')
+        wanted = base.ljust(8).encode('ascii') + ext.ljust(3).encode('ascii')
+        for offset in range(self.root_offset, self.root_offset + self.root_size, self.DIR_ENTRY_SIZE):
+            first = self._meta[offset]
+            if first == 0x00:  # No entries after this one
+                return None
+            attr = self._meta[offset + 11]
+            if first == 0xE5 or attr == self.ATTR_LONG_NAME or attr & (self.ATTR_VOLUME_LABEL | self.ATTR_DIRECTORY):
+                continue
+            if self._meta[offset:offset + 11] == wanted:
+                time_, date, cluster, size = struct.unpack_from('<HHHI', self._meta, offset + 22)
+                return cluster, size, (date << 16) | time_
+        return None
+
+    def _read_at(self, offset, size):
+        # os.pread is POSIX-only; seek and read work on Windows images too
+        self._file.seek(offset)
+        chunks = []
+        while size > 0:
+            chunk = self._file.read(size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b''.join(chunks)
+
+    def _next_cluster(self, cluster):
+        pair = struct.unpack_from('<H', self._meta, self.fat_offset + cluster + cluster // 2)[0]
+        return pair >> 4 if cluster & 1 else pair & 0xFFF
+
+    def read(self, entry):
+        """Reads a file's data given its directory entry from find()."""
+        cluster, size, _ = entry
+        runs = []  # [first cluster, cluster count] of each contiguous run
+        needed = -(-size // self.cluster_size)
+        while needed and 2 <= cluster < min(self.cluster_count + 2, 0xFF0):
+            if runs and runs[-1][0] + runs[-1][1] == cluster:
+                runs[-1][1] += 1
+            else:
+                runs.append([cluster, 1])
+            needed -= 1
+            cluster = self._next_cluster(cluster)
+        chunks = [self._read_at(self.data_offset + (first - 2) * self.cluster_size, count * self.cluster_size)
+                  for first, count in runs]
+        return b''.join(chunks)[:size]
+
+def open_raw_volume(drive):
+    """Opens a raw drive as a Fat12Volume, or returns None if no readable FAT12 disk is there."""
     try:
-        playback = sp.current_playback()
-        if playback and 'repeat_state' in playback:
-            current_state = playback['repeat_state']
-            new_state = "off"
-            if current_state == "off":
-                new_state = "context"  # Loop the playlist
-            elif current_state == "context":
-                new_state = "track"    # Loop the current track
-            elif current_state == "track":
-                new_state = "off"       # Disable looping
-
-            sp.repeat(new_state, device_id=LOCAL_DEVICE_ID)
-            log_message(f"Loop set to {new_state}.")
-    except spotipy.exceptions.SpotifyException as e:
-        log_message(f"Error toggling loop: {e}")
-        messagebox.showerror("Loop Error", str(e))
+        return Fat12Volume(drive)
+    except (OSError, ValueError):
+        return None
 
 # ----------------------------
 # Helper Functions for Unique ID
@@ -241,8 +1553,11 @@ def toggle_loop():
 def generate_unique_id():
     return str(uuid.uuid4())
 
-def write_unique_id(drive_letter, unique_id):
-    unique_id_path = f'{drive_letter}:\\unique_id.txt'
+@metrics.timer('floppy_io', op='write_unique_id')
+def write_unique_id(drive, unique_id):
+    if is_raw_drive(drive):
+        return  # Raw disks are never written; their volume serial is the identity
+    unique_id_path = floppy_path(drive, 'unique_id.txt')
     try:
         with open(unique_id_path, 'w') as f:
             f.write(unique_id)
@@ -250,8 +1565,15 @@ def write_unique_id(drive_letter, unique_id):
     except Exception as e:
         log_message(f"Error writing unique ID: {e}")
 
-def read_unique_id(drive_letter):
-    unique_id_path = f'{drive_letter}:\\unique_id.txt'
+@metrics.timer('floppy_io', op='read_unique_id')
+def read_unique_id(drive):
+    if is_raw_drive(drive):
+        volume = open_raw_volume(drive)
+        if volume is None:
+            return None
+        with volume:
+            return f"fat-{volume.serial}"
+    unique_id_path = floppy_path(drive, 'unique_id.txt')
     try:
         with open(unique_id_path, 'r') as f:
             unique_id = f.read().strip()
@@ -263,661 +1585,597 @@ def read_unique_id(drive_letter):
         log_message(f"Error reading unique ID: {e}")
         return None
 
-def unique_id_exists(drive_letter):
-    unique_id_path = f'{drive_letter}:\\unique_id.txt'
+def unique_id_exists(drive):
+    unique_id_path = floppy_path(drive, 'unique_id.txt')
     return os.path.exists(unique_id_path)
 
 # ----------------------------
-# Marquee Class for Scrolling Text
-# ----------------------------
-
-class Marquee(tk.Label):
-    def __init__(self, parent, text, font, width, fg, bg, delay=150):
-        super().__init__(parent, font=font, fg=fg, bg=bg, width=width, anchor='w')
-        self.original_text = text
-        self.text = text
-        self.delay = delay  # milliseconds
-        self.after_id = None
-        self.scroll_active = False
-        self.font_obj = tkFont.Font(font=self['font'])
-        self.bind('<Configure>', self.check_scroll)
-
-    def set_text(self, text):
-        self.original_text = text
-        self.check_scroll()
-
-    def check_scroll(self, event=None):
-        # Measure text width
-        text_width = self.font_obj.measure(self.original_text)
-        label_width = self.winfo_width()
-        if text_width > label_width:
-            if not self.scroll_active:
-                self.scroll_active = True
-                self.text = self.original_text + '   '  # Add spaces for smooth scrolling
-                self.current_index = 0
-                self.after_id = self.after(self.delay, self.scroll_text)
-        else:
-            if self.scroll_active:
-                self.scroll_active = False
-                if self.after_id:
-                    self.after_cancel(self.after_id)
-                    self.after_id = None
-            self.configure(text=self.original_text)
-
-    def scroll_text(self):
-        if self.scroll_active:
-            self.text = self.text[1:] + self.text[0]
-            self.configure(text=self.text)
-            self.after_id = self.after(self.delay, self.scroll_text)
-
-# ----------------------------
-# Gradient Background Canvas (Horizontal Gradient)
-# ----------------------------
-
-class GradientCanvas(tk.Canvas):
-    def __init__(self, parent, width, height, color1, color2, color3, **kwargs):
-        super().__init__(parent, width=width, height=height, highlightthickness=0, **kwargs)
-        self.width = width
-        self.height = height
-        self.color1 = color1
-        self.color2 = color2
-        self.color3 = color3
-        self.create_gradient()
-
-    def create_gradient(self):
-        """Creates a three-phase horizontal gradient."""
-        limit = self.width
-        for i in range(limit):
-            # Calculate intermediate color between color1 and color2
-            r1, g1, b1 = self.hex_to_rgb(self.color1)
-            r2, g2, b2 = self.hex_to_rgb(self.color2)
-            r = int(r1 + (r2 - r1) * i / (limit / 2))
-            g = int(g1 + (g2 - g1) * i / (limit / 2))
-            b = int(b1 + (b2 - b1) * i / (limit / 2))
-            if i > limit / 2:
-                # Calculate intermediate color between color2 and color3
-                ratio = (i - limit / 2) / (limit / 2)
-                r = int(r2 + (self.hex_to_rgb(self.color3)[0] - r2) * ratio)
-                g = int(g2 + (self.hex_to_rgb(self.color3)[1] - g2) * ratio)
-                b = int(b2 + (self.hex_to_rgb(self.color3)[2] - b2) * ratio)
-            color = f'#{r:02x}{g:02x}{b:02x}'
-            self.create_line(i, 0, i, self.height, fill=color)
-
-    @staticmethod
-    def hex_to_rgb(hex_color):
-        """Converts hex color to RGB tuple."""
-        hex_color = hex_color.lstrip('#')
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2 ,4))
-
-# ----------------------------
-# Custom Title Bar
+# Disk Catalog
 # ----------------------------
 
-class CustomTitleBar(tk.Frame):
-    def __init__(self, master, *args, **kwargs):
-        super().__init__(master, bg='#191925')  
-        self.master = master
-        self.init_widgets()
-        self.bind_events()
-
-    def init_widgets(self):
-        # Floppify Logo
-        try:
-            logo_image = Image.open("./images/floppify_logo.png").convert("RGBA")
-            logo_image = logo_image.resize((30, 30), Image.Resampling.LANCZOS)
-            self.logo_photo = ImageTk.PhotoImage(logo_image)
-            self.logo_label = tk.Label(self, image=self.logo_photo, bg='#191925')
-            self.logo_label.pack(side='left', padx=5)
-        except FileNotFoundError:
-            self.logo_label = tk.Label(self, text="FLOPPIFY", bg='#191925', fg='white', font=('Arial', 12, 'bold'))
-            self.logo_label.pack(side='left', padx=5)
-
-        # Window Title
-        self.title_label = tk.Label(self, text="FLOPPIFY", bg='#191925', fg='white', font=('LED Dot-Matrix', 12))
-        self.title_label.pack(side='left', padx=5)
-
-        # Spacer
-        self.spacer = tk.Label(self, bg='#191925')
-        self.spacer.pack(side='left', expand=True, fill='x')
-
-        # Minimize and Close Buttons
+@metrics.timer('floppy_io', op='read_playlist')
+def read_playlist(drive):
+    """
+    Reads playlist.txt, returning its non-empty lines and a content hash
+    (or (None, None) if the file is missing).
+    """
+    if is_raw_drive(drive):
+        volume = open_raw_volume(drive)
+        entry = volume and volume.find('playlist.txt')
+        if not entry:
+            if volume:
+                volume.close()
+            return None, None
+        with volume:
+            data = volume.read(entry)
+    else:
         try:
-            minimize_image = Image.open("./images/minimize.png").convert("RGBA")
-            minimize_image = minimize_image.resize((20, 20), Image.Resampling.LANCZOS)
-            self.minimize_photo = ImageTk.PhotoImage(minimize_image)
-            self.minimize_button = tk.Button(self, image=self.minimize_photo, bg='#191925', bd=0, activebackground='#006400', command=self.minimize_window)
-            self.minimize_button.pack(side='right', padx=2)
-
-            close_image = Image.open("./images/close.png").convert("RGBA")
-            close_image = close_image.resize((20, 20), Image.Resampling.LANCZOS)
-            self.close_photo = ImageTk.PhotoImage(close_image)
-            self.close_button = tk.Button(self, image=self.close_photo, bg='#191925', bd=0, activebackground='#006400', command=self.master.destroy)
-            self.close_button.pack(side='right', padx=2)
+            with open(floppy_path(drive, 'playlist.txt'), 'rb') as f:
+                data = f.read()
         except FileNotFoundError:
-            self.minimize_button = tk.Button(self, text="_", bg='#191925', fg='white', bd=0, command=self.minimize_window)
-            self.minimize_button.pack(side='right', padx=2)
-            self.close_button = tk.Button(self, text="X", bg='#191925', fg='white', bd=0, command=self.master.destroy)
-            self.close_button.pack(side='right', padx=2)
-
-    def bind_events(self):
-        self.bind("<ButtonPress-1>", self.start_move)
-        self.bind("<ButtonRelease-1>", self.stop_move)
-        self.bind("<B1-Motion>", self.on_move)
-
-        self.logo_label.bind("<ButtonPress-1>", self.start_move)
-        self.logo_label.bind("<ButtonRelease-1>", self.stop_move)
-        self.logo_label.bind("<B1-Motion>", self.on_move)
+            return None, None
+    lines = [line.strip() for line in data.decode('utf-8', errors='replace').splitlines() if line.strip()]
+    return lines, hashlib.sha256(data).hexdigest()
 
-        self.title_label.bind("<ButtonPress-1>", self.start_move)
-        self.title_label.bind("<ButtonRelease-1>", self.stop_move)
-        self.title_label.bind("<B1-Motion>", self.on_move)
-
-    def minimize_window(self):
-        self.master.iconify()
-
-    def start_move(self, event):
-        self.x = event.x
-        self.y = event.y
+class DiskCatalog:
+    """
+    Persistent SQLite catalog of known disks keyed by unique_id. Each record
+    holds the parsed playlist entries (line, uri, name, cover_url), the hash of
+    the playlist.txt they came from and when the disk was last played, so a
+    known disk can start playing without any metadata round-trip.
+    """
 
-    def stop_move(self, event):
-        self.x = None
-        self.y = None
+    def __init__(self, path=CATALOG_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS disks ("
+                " unique_id TEXT PRIMARY KEY,"
+                " playlist_hash TEXT NOT NULL,"
+                " entries TEXT NOT NULL,"
+                " last_played REAL)"
+            )
+
+    def get(self, unique_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT playlist_hash, entries, last_played FROM disks WHERE unique_id = ?", (unique_id,)
+            ).fetchone()
+        if not row:
+            return None
+        return {'playlist_hash': row[0], 'entries': json.loads(row[1]), 'last_played': row[2]}
+
+    def save(self, unique_id, playlist_hash, entries):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO disks (unique_id, playlist_hash, entries) VALUES (?, ?, ?)"
+                " ON CONFLICT(unique_id) DO UPDATE SET playlist_hash = excluded.playlist_hash,"
+                " entries = excluded.entries",
+                (unique_id, playlist_hash, json.dumps(entries)),
+            )
+
+    def update_entries(self, unique_id, playlist_hash, entries):
+        """Stores refreshed entries, unless the disk's playlist changed in the meantime."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE disks SET entries = ? WHERE unique_id = ? AND playlist_hash = ?",
+                (json.dumps(entries), unique_id, playlist_hash),
+            )
+
+    def touch(self, unique_id):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE disks SET last_played = ? WHERE unique_id = ?", (time.time(), unique_id))
+
+disk_catalog = DiskCatalog()
+
+class MetadataCache:
+    """
+    Persistent TTL cache of item display names and cover URLs keyed by
+    Spotify URI, stored next to the disk catalog so it is shared across runs
+    and across disks that list the same item.
+    """
 
-    def on_move(self, event):
-        deltax = event.x - self.x
-        deltay = event.y - self.y
-        x = self.master.winfo_x() + deltax
-        y = self.master.winfo_y() + deltay
-        self.master.geometry(f"+{x}+{y}")
+    def __init__(self, path=CATALOG_PATH, ttl=METADATA_CACHE_TTL):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl = ttl
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS metadata ("
+                " uri TEXT PRIMARY KEY,"
+                " info TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL)"
+            )
+
+    def get(self, uri):
+        """Returns the cached info for uri, or None if it is missing or older than the TTL."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT info FROM metadata WHERE uri = ? AND fetched_at > ?", (uri, time.time() - self.ttl)
+            ).fetchone()
+        metrics.inc('metadata_cache_total', result='hit' if row else 'miss')
+        return json.loads(row[0]) if row else None
+
+    def put(self, uri, info):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO metadata (uri, info, fetched_at) VALUES (?, ?, ?)"
+                " ON CONFLICT(uri) DO UPDATE SET info = excluded.info, fetched_at = excluded.fetched_at",
+                (uri, json.dumps(info), time.time()),
+            )
+
+metadata_cache = MetadataCache()
+
+RESOLVE_WORKERS = 8  # Concurrent metadata lookups when a disk is inserted
+resolver_pool = ThreadPoolExecutor(max_workers=RESOLVE_WORKERS, thread_name_prefix='resolve')
+
+def parse_playlist_entries(lines):
+    """
+    Turns playlist.txt lines into catalog entries. Lines that do not parse as a
+    Spotify URI or URL are flagged invalid straight away.
+    """
+    entries = []
+    for line in lines:
+        uri = parse_spotify_uri(line)
+        entries.append({'line': line, 'uri': uri, 'name': None, 'cover_url': None,
+                        'valid': None if uri else False})
+    return entries
+
+def resolve_entry(entry):
+    """
+    Fills in an entry's display name and cover URL from Spotify. Entries Spotify
+    rejects (400 or 404) are flagged invalid; transient errors leave the entry
+    unverified so it is retried on the next refresh. URI types with no metadata
+    lookup (shows, episodes) stay playable without a name.
+    """
+    if not entry['uri']:
+        return entry
+    try:
+        info = fetch_spotify_item_info(entry['uri'])
+    except spotipy.exceptions.SpotifyException as e:
+        if e.http_status in (400, 404):
+            entry['valid'] = False
+        log_message(f"Error resolving {entry['line']}: {e}")
+        return entry
+    except Exception as e:
+        log_message(f"Error resolving {entry['line']}: {e}")
+        return entry
+    if info:
+        entry.update(info)
+        entry['valid'] = True
+    return entry
+
+def is_playable(entry):
+    return entry['uri'] is not None and entry.get('valid') is not False
+
+def resolve_entries(entries):
+    """Resolves all entries concurrently on the resolver pool."""
+    return list(resolver_pool.map(resolve_entry, [dict(entry) for entry in entries]))
+
+def refresh_disk_entries(unique_id, playlist_hash, entries):
+    """Re-resolves every entry's metadata and stores it in the catalog (run in the background)."""
+    disk_catalog.update_entries(unique_id, playlist_hash, resolve_entries(entries))
+
+def save_resolved_entries(unique_id, playlist_hash, entries, futures):
+    """Waits for a new disk's lookups to finish, then records them in the catalog."""
+    wait(futures)
+    for entry in entries:
+        if entry['valid'] is False:
+            log_message(f"Skipping invalid playlist entry: {entry['line']}")
+    disk_catalog.save(unique_id, playlist_hash, entries)
 
 # ----------------------------
-#  Floppify Player GUI
+# Disk Watchers
 # ----------------------------
 
-class FloppifyPlayer:
-    def __init__(self, master):
-        self.master = master
-        # Set window size to 550x450 and allow resizing
-        self.master.geometry("550x450")
-        self.master.resizable(True, True)
-        self.master.overrideredirect(True)  # Remove default window decorations
-
-        # Initialize Gradient Background
-        self.gradient = GradientCanvas(master, width=550, height=450, color1='#191925', color2='#31314f', color3='#1c1c2c')
-        self.gradient.place(x=0, y=0)
-
-        # Initialize Custom Title Bar
-        self.title_bar = CustomTitleBar(master)
-        self.title_bar.place(x=0, y=0, width=550, height=40)
-
-        # Define font styles
-        try:
-            label_font = ('LED Dot-Matrix', 10)  # Ensure this font is installed
-            text_font = ('LED Dot-Matrix', 16)
-        except:
-            # Fallback to default font if custom font not available
-            label_font = ('Courier', 10)
-            text_font = ('Courier', 16)
-
-        # ------------------------
-        # Layout Frames with Reverse Bevel
-        # ------------------------
-        bevel_options = {'relief': 'sunken', 'bd': 2, 'bg': '#1f1f2e'}  # Dark grey background
-        bevel_options_text = {'relief': 'sunken', 'bd': 2, 'bg': '#191925'}  # Dark grey background
-
-        self.right_frame = tk.Frame(master, **bevel_options)
-        self.right_frame.place(x=230, y=60, width=300, height=200)
-
-        self.buttons_frame = tk.Frame(master, **bevel_options)
-        self.buttons_frame.place(x=20, y=270, width=510, height=60)
-
-        self.log_frame = tk.Frame(master, **bevel_options)
-        self.log_frame.place(x=20, y=350, width=510, height=80)
-
-        # ------------------------
-        # Left Section: Floppy Disk with Album Cover (Placed Directly on Gradient)
-        # ------------------------
-        try:
-            floppy_image = Image.open("./images/floppy_disk.png").convert("RGBA")
-            floppy_image = floppy_image.resize((200, 200), Image.Resampling.LANCZOS)
-            self.floppy_photo = ImageTk.PhotoImage(floppy_image)
-            # Place floppy_label directly on the gradient canvas with dark grey background
-            self.floppy_label = tk.Label(master, image=self.floppy_photo, bg='#1f1f2e', relief='sunken', bd=1)
-            self.floppy_label.image = self.floppy_photo  # Prevent garbage collection
-            # Position the floppy_label at (120, 160)
-            self.gradient.create_window(120, 160, window=self.floppy_label)
-        except FileNotFoundError:
-            # If the image is not found, display a placeholder text directly on the gradient
-            self.floppy_label = tk.Label(master, text="Floppy Disk", fg='#FFFFFF', bg='#1f1f2e', font=('Arial', 12))
-            self.gradient.create_window(120, 160, window=self.floppy_label)
-
-        # Placeholder for Album Cover (Placed Directly on Gradient) - COVER LOCATION
-        self.album_cover_photo = None
-        self.album_cover_label = tk.Label(master, bg='#1f1f2e')
-        self.album_cover_label.image = None  # Initialize to prevent errors
-        self.gradient.create_window(120, 120, window=self.album_cover_label)  # Adjust coordinates as needed
-
-        # ----------------------------
-        # Right Frame: Track, Artist, Album Information
-        # ----------------------------
-        # Track Information
-        track_frame = tk.Frame(self.right_frame, bg='#1f1f2e')
-        track_frame.pack(anchor='nw', pady=(10,0), fill='x')
-
-        track_static = tk.Label(track_frame, text='TRK:', font=label_font, fg='cyan', bg='#1f1f2e')
-        track_static.pack(side='left', padx=5)
-
-        self.track_marquee = Marquee(track_frame, text='', font=text_font, width=25, fg='#00FF00', bg='#030303')
-        self.track_marquee.pack(side='left', padx=5)
-
-        # Artist Information
-        artist_frame = tk.Frame(self.right_frame, bg='#1f1f2e')
-        artist_frame.pack(anchor='nw', pady=0, fill='x')
-
-        artist_static = tk.Label(artist_frame, text='ART:', font=label_font, fg='cyan', bg='#1f1f2e')
-        artist_static.pack(side='left', padx=5)
-
-        self.artist_marquee = Marquee(artist_frame, text='', font=text_font, width=25, fg='#00FF00', bg='#030303')
-        self.artist_marquee.pack(side='left', padx=5)
-
-        # Album Information
-        album_frame = tk.Frame(self.right_frame, bg='#1f1f2e')
-        album_frame.pack(anchor='nw', pady=0, fill='x')
-
-        album_static = tk.Label(album_frame, text='ALB:', font=label_font, fg='cyan', bg='#1f1f2e')
-        album_static.pack(side='left', padx=5)
+class AdaptivePoller:
+    """
+    Chooses how long to wait between disk checks: fast right after an eject
+    (another disk is probably on its way), backing off while the drive sits idle.
+    """
 
-        self.album_marquee = Marquee(album_frame, text='', font=text_font, width=25, fg='#00FF00', bg='#030303')
-        self.album_marquee.pack(side='left', padx=5)
+    def __init__(self, fast=0.25, idle=5.0, inserted=2.0, backoff=1.5):
+        self.fast = fast
+        self.idle = idle
+        self.inserted = inserted
+        self.backoff = backoff
+        self.current = idle
 
-        # ------------------------
-        # Additional Information: kbps and kHz
-        # ------------------------
-        info_frame = tk.Frame(self.right_frame, bg='#1f1f2e')
-        info_frame.pack(anchor='nw', pady=5, fill='x')
+    def on_eject(self):
+        self.current = self.fast
 
-        kbps_label = tk.Label(info_frame, text='KBPS:', font=label_font, fg='cyan', bg='#1f1f2e')
-        kbps_label.pack(side='left', padx=5)
+    def next_interval(self, inserted):
+        if inserted:
+            return self.inserted
+        interval = self.current
+        self.current = min(self.current * self.backoff, self.idle)
+        return interval
 
-        self.kbps_var = tk.StringVar(value="190")
-        self.kbps_display = tk.Label(info_frame, textvariable=self.kbps_var, font=text_font, fg='#00FF00', bg='#030303')
-        self.kbps_display.pack(side='left', padx=5)
+class DiskWatcher:
+    """Polling backend: simply sleeps until the next scheduled check."""
 
-        khz_label = tk.Label(info_frame, text='KHZ:', font=label_font, fg='cyan', bg='#1f1f2e')
-        khz_label.pack(side='left', padx=15)
+    def wait(self, timeout):
+        """Blocks for up to timeout seconds; returns True if a change event woke it early."""
+        time.sleep(timeout)
+        return False
 
-        self.khz_var = tk.StringVar(value="44")
-        self.khz_display = tk.Label(info_frame, textvariable=self.khz_var, font=text_font, fg='#00FF00', bg='#030303')
-        self.khz_display.pack(side='left', padx=5)
+    def close(self):
+        pass
 
-        # ----------------------------
-        # Volume Control: 11 Segments with Gradient and Buttons
-        # ----------------------------
-        volume_frame = tk.Frame(self.right_frame, bg='#1f1f2e')
-        volume_frame.pack(pady=(10, 0), fill='x')
+class LinuxDiskWatcher(DiskWatcher):
+    """
+    Linux backend driven by kernel events: /proc/self/mountinfo is flagged with
+    POLLPRI whenever the mount table changes, and inotify watches on the mount
+    points report playlist.txt edits and eject of an always-mounted drive. One
+    watcher covers any number of drives.
+    """
 
-        # Volume Down Button
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    WATCH_MASK = (0x002 | 0x004 | 0x008 | 0x040 | 0x080 | 0x100 | 0x200 | 0x400 | 0x800 | 0x2000)
+    # IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE |
+    # IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_UNMOUNT
+
+    def __init__(self, paths):
+        import ctypes
+        self.paths = [os.fsencode(path) for path in paths]
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self._inotify_fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._inotify_fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._mountinfo = open('/proc/self/mountinfo', 'rb')
+        self._poll = select.poll()
+        self._poll.register(self._mountinfo.fileno(), select.POLLPRI | select.POLLERR)
+        self._poll.register(self._inotify_fd, select.POLLIN)
+        self._watch()
+
+    def _watch(self):
+        # Re-adding is cheap and follows the mount point to whatever filesystem is mounted there now
+        for path in self.paths:
+            self._libc.inotify_add_watch(self._inotify_fd, path, self.WATCH_MASK)
+
+    def wait(self, timeout):
+        events = self._poll.poll(timeout * 1000)
+        if not events:
+            return False
         try:
-            volume_down_image = Image.open("./images/volume_down.png").convert("RGBA")
-            volume_down_image = volume_down_image.resize((30, 30), Image.Resampling.LANCZOS)
-            self.volume_down_photo = ImageTk.PhotoImage(volume_down_image)
-            self.volume_down_button = tk.Button(volume_frame, image=self.volume_down_photo, bg='#1f1f2e', bd=0, activebackground='#696969', command=self.decrease_volume)
-            self.volume_down_button.pack(side='left', padx=5)
-        except FileNotFoundError:
-            self.volume_down_button = tk.Button(volume_frame, text="↓", bg='#1f1f2e', fg='#00FF00', bd=0, font=('Arial', 12), command=self.decrease_volume)
-            self.volume_down_button.pack(side='left', padx=5)
-
-        # Volume Segments
-        self.volume_segments = []
-        segment_width = 20
-        segment_height = 20
-        spacing = 2
-        for i in range(11):
-            frame = tk.Frame(volume_frame, width=segment_width, height=segment_height, bg='#1f1f2e', relief='raised', bd=1)
-            frame.pack(side='left', padx=1)
-            self.volume_segments.append(frame)
-
-        # Volume Up Button
+            while os.read(self._inotify_fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        self._watch()
+        return True
+
+    def close(self):
+        self._mountinfo.close()
+        os.close(self._inotify_fd)
+
+def create_disk_watcher(drives, backend=DISK_WATCHER):
+    """
+    Returns the best disk watcher available for these drives and platform,
+    and a factory for the per-drive AdaptivePoller to pair with it.
+    """
+    # Raw devices report no events on media change; image files are watched through their directory
+    event_driven = all(len(drive) > 1 and not drive.startswith('/dev/') for drive in drives)
+    if backend != 'poll' and event_driven and sys.platform.startswith('linux'):
         try:
-            volume_up_image = Image.open("./images/volume_up.png").convert("RGBA")
-            volume_up_image = volume_up_image.resize((30, 30), Image.Resampling.LANCZOS)
-            self.volume_up_photo = ImageTk.PhotoImage(volume_up_image)
-            self.volume_up_button = tk.Button(volume_frame, image=self.volume_up_photo, bg='#1f1f2e', bd=0, activebackground='#696969', command=self.increase_volume)
-            self.volume_up_button.pack(side='left', padx=5)
-        except FileNotFoundError:
-            self.volume_up_button = tk.Button(volume_frame, text="↑", bg='#1f1f2e', fg='#00FF00', bd=0, font=('Arial', 12), command=self.increase_volume)
-            self.volume_up_button.pack(side='left', padx=5)
+            watcher = LinuxDiskWatcher([os.path.dirname(drive) or '.' if is_raw_drive(drive) else drive
+                                        for drive in drives])
+            log_message("Watching mount and inotify events for floppy changes.")
+            # Kernel events cover insert, eject and edits, so idle polling can back off much further
+            return watcher, functools.partial(AdaptivePoller, inserted=30.0, idle=30.0)
+        except (OSError, AttributeError) as e:
+            log_message(f"Event-driven disk watcher unavailable ({e}), falling back to polling.")
+    return DiskWatcher(), AdaptivePoller
 
-        # Initialize current volume
-        self.current_volume = 50  # Default volume
-        self.update_volume_segments(self.current_volume)
+# ----------------------------
+# Main Loop to Monitor the Floppy Disk
+# ----------------------------
 
-        # ----------------------------
-        # Buttons Frame: Shuffle, Loop, Previous, Play/Pause, Next
-        # ----------------------------
-        # Load button images
-        try:
-            self.prev_img = ImageTk.PhotoImage(Image.open("./images/previous.png").resize((50, 40), Image.Resampling.LANCZOS))
-            self.play_img = ImageTk.PhotoImage(Image.open("./images/play.png").resize((50, 40), Image.Resampling.LANCZOS))
-            self.pause_img = ImageTk.PhotoImage(Image.open("./images/pause.png").resize((50, 40), Image.Resampling.LANCZOS))
-            self.next_img = ImageTk.PhotoImage(Image.open("./images/next.png").resize((50, 40), Image.Resampling.LANCZOS))
-            self.shuffle_img = ImageTk.PhotoImage(Image.open("./images/shuffle.png").resize((120, 30), Image.Resampling.LANCZOS))
-            self.loop_img = ImageTk.PhotoImage(Image.open("./images/loop.png").resize((60, 30), Image.Resampling.LANCZOS))
-        except FileNotFoundError as e:
-            messagebox.showerror("Image Error", f"Button image not found: {e}")
-            return
+def play_from_floppy(drive, unique_id, device_id=LOCAL_DEVICE_ID):
+    """
+    Picks an entry from the disk's playlist.txt and starts playing it. Known
+    disks with an unchanged playlist play straight from the catalog and have
+    their metadata refreshed in the background. For new or edited playlists
+    every entry is resolved concurrently in shuffled order, so the random pick's
+    lookup goes out first and it plays as soon as that succeeds; entries Spotify
+    rejects are skipped.
+    """
+    lines, playlist_hash = read_playlist(drive)
+    if not lines:
+        return False
+
+    record = disk_catalog.get(unique_id)
+    if record and record['playlist_hash'] == playlist_hash:
+        log_message("Known disk, playing from catalog.")
+        entries = record['entries']
+        playable = [entry for entry in entries if is_playable(entry)]
+        if not playable:
+            return False
+        entry = random.choice(playable)  # Select one at random
+        threading.Thread(target=refresh_disk_entries, args=(unique_id, playlist_hash, entries), daemon=True).start()
+    else:
+        entries = parse_playlist_entries(lines)
+        candidates = [entry for entry in entries if entry['uri']]
+        random.shuffle(candidates)  # Select one at random, falling through dead links
+        futures = {id(entry): resolver_pool.submit(resolve_entry, entry) for entry in candidates}
+        threading.Thread(target=save_resolved_entries,
+                         args=(unique_id, playlist_hash, entries, list(futures.values())), daemon=True).start()
+        entry = None
+        for candidate in candidates:
+            futures[id(candidate)].result()
+            if is_playable(candidate):
+                entry = candidate
+                break
+        if entry is None:
+            log_message("No playable entries on this disk.")
+            return False
 
-        # Previous Button
-        self.prev_button = tk.Button(
-            self.buttons_frame, image=self.prev_img, bg='#1f1f2e', bd=0, activebackground='#696969',
-            command=lambda: sp.previous_track(device_id=LOCAL_DEVICE_ID)
-        )
-        self.prev_button.pack(side='left', padx=1)
-
-        # Play/Pause Button
-        self.play_pause_button = tk.Button(
-            self.buttons_frame, image=self.play_img, bg='#1f1f2e', bd=0, activebackground='#696969',
-            command=self.on_play_pause
-        )
-        self.play_pause_button.pack(side='left', padx=1)
-
-        # Next Button
-        self.next_button = tk.Button(
-            self.buttons_frame, image=self.next_img, bg='#1f1f2e', bd=0, activebackground='#696969',
-            command=lambda: sp.next_track(device_id=LOCAL_DEVICE_ID)
-        )
-        self.next_button.pack(side='left', padx=1)
-
-        # Shuffle Button
-        self.shuffle_button = tk.Button(
-            self.buttons_frame, image=self.shuffle_img, bg='#1f1f2e', bd=0, activebackground='#696969',
-            command=self.toggle_shuffle
-        )
-        self.shuffle_button.pack(side='left', padx=30)
-
-        # Loop Button
-        self.loop_button = tk.Button(
-            self.buttons_frame, image=self.loop_img, bg='#1f1f2e', bd=0, activebackground='#696969',
-            command=self.toggle_loop
-        )
-        self.loop_button.pack(side='left', padx=1)
-
-        # ----------------------------
-        # Log Frame: Console/Message Log
-        # ----------------------------
-        # Create a Text widget for logs (read-only)
-        self.log_text = tk.Text(self.log_frame, height=5, width=95, bg='#000000', fg='lime', state='disabled', bd=0, wrap='word', font=('LED Dot-Matrix', 12))
-        self.log_text.pack()
-
-        # Initialize log history
-        self.log_history = []
-
-        # Start the GUI update loop
-        self.update_gui()
-
-    # ----------------------------
-    # Playback Control Methods
-    # ----------------------------
-
-    def on_play_pause(self):
-        toggle_play_pause()
-        self.update_play_pause_button()
-
-    def update_play_pause_button(self):
-        playback = sp.current_playback()
-        if playback and playback['is_playing']:
-            self.play_pause_button.config(image=self.pause_img)
-            self.is_playing = True
-        else:
-            self.play_pause_button.config(image=self.play_img)
-            self.is_playing = False
-
-    def toggle_shuffle(self):
-        toggle_shuffle()
-
-    def toggle_loop(self):
-        toggle_loop()
-
-    # ----------------------------
-    # Volume Control Methods
-    # ----------------------------
-
-    def increase_volume(self):
-        if self.current_volume < 100:
-            self.current_volume += 10
-            if self.current_volume > 100:
-                self.current_volume = 100
-            self.set_volume(self.current_volume)
-
-    def decrease_volume(self):
-        if self.current_volume > 0:
-            self.current_volume -= 10
-            if self.current_volume < 0:
-                self.current_volume = 0
-            self.set_volume(self.current_volume)
-
-    def set_volume(self, volume):
-        """Sets the volume both in Spotify and updates the GUI segments."""
-        try:
-            sp.volume(volume, device_id=LOCAL_DEVICE_ID)
-            log_message(f"Volume set to {volume}%")
-            self.update_volume_segments(volume)
-            self.current_volume = volume
-        except spotipy.exceptions.SpotifyException as e:
-            log_message(f"Error setting volume: {e}")
-            messagebox.showerror("Volume Error", str(e))
-
-    def update_volume_segments(self, volume):
-        """Updates the visual representation of volume segments."""
-        segments_to_fill = volume // 10
-        for i in range(11):
-            if i <= segments_to_fill:
-                # Apply gradient color
-                color = self.get_gradient_color(i)
-                self.volume_segments[i].config(bg=color)
-            else:
-                self.volume_segments[i].config(bg='#1f1f2e')
-
-    def get_gradient_color(self, segment):
-        """Returns a color based on the segment index for gradient effect."""
-        if 0 <= segment <= 2:
-                return '#006400'  # Dark green for first 3 segments
-        elif 3 <= segment <= 4:
-                return '#00FF00'  # Light green for next 2 segments
-        elif 5 <= segment <= 6:
-                return '#FFFF00'  # Yellow for next 2 segments
-        elif 7 <= segment <= 8:
-                return '#FFA500'  # Orange for next 2 segments
-        elif 9 <= segment <= 10:
-                return '#FF0000'  # Red for last 2 segments
-        else:
-                return '#FF0000'  # Default to Red if out of range
+    if entry['name']:
+        log_message(f"Playing {entry['name']} ({entry['uri']})")
+    else:
+        log_message(f"Playing URI: {entry['uri']}")
+    play_spotify_uri(entry['uri'], device_id)
+    disk_catalog.touch(unique_id)
+    return True
 
-    # ----------------------------
-    # GUI Update Loop
-    # ----------------------------
+def parse_drives(spec=FLOPPY_DRIVES):
+    """
+    Parses FLOPPY_DRIVES ("path=device_id,..."; the device defaults to
+    LOCAL_DEVICE_ID) into (drive, device_id) pairs. Without it there is a
+    single drive, FLOPPY_MOUNT_PATH or DRIVE_LETTER.
+    """
+    drives = []
+    for item in spec.split(','):
+        if item.strip():
+            drive, _, device_id = item.partition('=')
+            drives.append((drive.strip(), device_id.strip() or LOCAL_DEVICE_ID))
+    return drives or [(FLOPPY_MOUNT_PATH or DRIVE_LETTER, LOCAL_DEVICE_ID)]  # Loaded from .env
+
+class FloppyDrive:
+    """
+    State machine for one drive and the Spotify device it plays on. check()
+    runs on the DriveManager's thread and only stats playlist.txt; inserts,
+    edits and ejects are handled on the drive's own worker, so a slow disk
+    or lookup never holds up the other drives. A failed insert or edit is
+    reported and retried as a fresh insert on the next check.
+    """
 
-    def update_gui(self):
+    def __init__(self, manager, drive, device_id, poller):
+        self.manager = manager
+        self.drive = drive
+        self.device_id = device_id
+        self.poller = poller
+        self.disk_inserted = False
+        self.signature = None  # Stat signature of playlist.txt on the inserted disk
+        self.unique_id = None
+        self.current_unique_id = None  # Tracks the current session's unique ID
+        self.retry_insert = False  # Set by the worker when handling the disk failed
+        self.failures = 0
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix='drive')
+
+    def check(self):
+        """Compares the drive with its last known state; returns the next poll interval."""
+        new_signature = playlist_signature(self.drive)
+        inserted = new_signature is not None
+        log_message("Disk Inserted (%s): %s", self.drive, inserted, level=logging.DEBUG)
+        if self.retry_insert:
+            self.retry_insert = False
+            if inserted:
+                self.disk_inserted = False  # Handle the disk again from scratch
+
+        if inserted and not self.disk_inserted:
+            self._worker.submit(self._run, self.on_insert)
+        elif not inserted and self.disk_inserted:
+            self._worker.submit(self._run, self.on_eject)
+            self.poller.on_eject()
+        elif inserted and self.disk_inserted and new_signature != self.signature:
+            self._worker.submit(self._run, self.on_edit)
+
+        self.disk_inserted = inserted
+        self.signature = new_signature
+        return self.poller.next_interval(inserted)
+
+    def _run(self, handler):
+        # Runs an insert, edit or eject handler on the worker, surfacing any error
         try:
-            # Process any messages in the log_queue
-            while not log_queue.empty():
-                message = log_queue.get_nowait()
-                # Avoid printing duplicate consecutive messages
-                if not self.log_history or self.log_history[-1] != message:
-                    self.log_history.append(message)
-                    if len(self.log_history) > 10:
-                        self.log_history.pop(0)
-                    # Update the log_text widget
-                    self.log_text.config(state='normal')
-                    self.log_text.delete(1.0, tk.END)
-                    self.log_text.insert(tk.END, '\n'.join(self.log_history))
-                    self.log_text.config(state='disabled')
-
-            playback = sp.current_playback()
-            if playback:
-                is_playing = playback['is_playing']
-                track = playback['item']
-                if is_playing and track:
-                    track_name = track['name']
-                    artist_name = ', '.join([artist['name'] for artist in track['artists']])
-                    album_name = track['album']['name']
-                    album_cover_url = track['album']['images'][0]['url']
-
-                    # Update Marquee texts
-                    self.track_marquee.set_text(f'{track_name}')
-                    self.artist_marquee.set_text(f'{artist_name}')
-                    self.album_marquee.set_text(f'{album_name}')
-
-                    # Update Album Cover  -- COVER SIZE
-                    response = requests.get(album_cover_url)
-                    img_data = response.content
-                    img = Image.open(BytesIO(img_data)).convert("RGBA")
-                    img = img.resize((110, 95), Image.Resampling.LANCZOS)
-                    album_cover = ImageTk.PhotoImage(img)
-
-                    # Overlay Album Cover on Gradient Canvas
-                    # Remove previous album cover if exists
-                    if self.album_cover_photo:
-                        self.album_cover_label.config(image='')
-                        self.album_cover_label.image = None
-                    self.album_cover_photo = album_cover
-                    self.album_cover_label.config(image=self.album_cover_photo)
-                    self.album_cover_label.image = self.album_cover_photo  # Prevent garbage collection
-
-                    # Update Play/Pause Button Icon
-                    self.play_pause_button.config(image=self.pause_img)
-                    self.is_playing = True
-
-                    # Update kbps and kHz (Set to fixed values as per user instruction)
-                    self.kbps_var.set("190")
-                    self.khz_var.set("44")
-
-                    # Update Volume Segments and enforce app's volume control
-                    if 'device' in playback and playback['device']:
-                        current_volume = playback['device']['volume_percent']
-                        if self.current_volume != current_volume:
-                            log_message(f"Spotify volume changed externally to {current_volume}%, resetting to {self.current_volume}%")
-                            self.set_volume(self.current_volume)
-                else:
-                    # Update Marquee texts to default
-                    self.track_marquee.set_text('Not available')
-                    self.artist_marquee.set_text('Not available')
-                    self.album_marquee.set_text('Not available')
-                    
-                    # Remove Album Cover
-                    if self.album_cover_photo:
-                        self.album_cover_label.config(image='')
-                        self.album_cover_label.image = None
-
-                    # Update Play/Pause Button Icon
-                    self.play_pause_button.config(image=self.play_img)
-                    self.is_playing = False
-
-                    # Update kbps and kHz
-                    self.kbps_var.set("N/A")
-                    self.khz_var.set("N/A")
+            handler()
+        except Exception as e:
+            if handler != self.on_eject:
+                self.retry_insert = True
+            self.failures += 1
+            if self.failures == 1:
+                report_error("Disk Error", f"Error reading the disk in {self.drive}: {e}")
             else:
-                # No playback information available
-                self.track_marquee.set_text('Not available')
-                self.artist_marquee.set_text('Not available')
-                self.album_marquee.set_text('Not available')
-                
-                # Remove Album Cover
-                if self.album_cover_photo:
-                    self.album_cover_label.config(image='')
-                    self.album_cover_label.image = None
-
-                # Update Play/Pause Button Icon
-                self.play_pause_button.config(image=self.play_img)
-                self.is_playing = False
-
-                # Update kbps and kHz
-                self.kbps_var.set("N/A")
-                self.khz_var.set("N/A")
+                log_message(f"Retry {self.failures - 1} failed for {self.drive}: {e}", level=logging.WARNING)
+        else:
+            self.failures = 0
+
+    def on_insert(self):
+        # Disk was inserted
+        log_message(f"Disk inserted in {self.drive}")
+        unique_id = read_unique_id(self.drive)
+        if not unique_id:
+            # If unique_id.txt does not exist, generate and write it
+            unique_id = generate_unique_id()
+            write_unique_id(self.drive, unique_id)
+            log_message(f"Generated new unique ID for disk: {unique_id}")
+        self.unique_id = unique_id
+
+        if unique_id != self.current_unique_id:
+            # Play a new playlist
+            self.play(unique_id)
+
+    def on_eject(self):
+        # Disk was removed
+        log_message(f"Disk removed from {self.drive}")
+        if self.manager.release(self):
+            stop_playback(self.device_id)
+        self.current_unique_id = None  # Clear the unique ID
+        log_message("Internal unique ID cleared.")
+
+    def on_edit(self):
+        # Disk is still inserted but playlist.txt was edited
+        log_message(f"playlist.txt changed in {self.drive}, reloading disk")
+        # Re-read the identity in case the disk was swapped between two checks
+        self.unique_id = read_unique_id(self.drive) or self.unique_id
+        self.play(self.unique_id)
+
+    def play(self, unique_id):
+        if play_from_floppy(self.drive, unique_id, self.device_id):
+            self.current_unique_id = unique_id
+            self.manager.claim(self)
+            log_message(f"Internal unique ID set to: {self.current_unique_id}")
+
+class DriveManager:
+    """
+    Watches every configured drive from one thread with one disk watcher.
+    Drives share the Spotify session, HTTP pool and caches; the account can
+    only play on one device at a time, so the drive that last started
+    playback owns it, and only that drive's eject stops playback. The GUI's
+    player commands follow the owner's device.
+    """
 
-        except Exception as e:
-            log_message(f"Error in update_gui: {e}")
-        # Schedule the next update
-        self.master.after(1000, self.update_gui)  # Updated to 1 second for smoother updates
+    def __init__(self, drives, dispatcher=command_dispatcher):
+        self.watcher, make_poller = create_disk_watcher([drive for drive, _ in drives])
+        self.drives = [FloppyDrive(self, drive, device_id, make_poller()) for drive, device_id in drives]
+        self.dispatcher = dispatcher
+        self._owner = None
+        self._lock = threading.Lock()
+
+    def claim(self, drive):
+        with self._lock:
+            self._owner = drive
+            self.dispatcher.device_id = drive.device_id
+
+    def release(self, drive):
+        """Gives up playback ownership; returns True if drive was the owner."""
+        with self._lock:
+            if self._owner is not drive:
+                return False
+            self._owner = None
+            return True
 
-# ----------------------------
-# Main Loop to Monitor the Floppy Disk
-# ----------------------------
+    def run(self):
+        while True:
+            # Every drive's poller must advance, so don't short-circuit
+            intervals = [drive.check() for drive in self.drives]
+            self.watcher.wait(min(intervals))
 
 def main():
-    current_unique_id = None  # Tracks the current session's unique ID
-    disk_inserted = False
-    drive_letter = DRIVE_LETTER  # Loaded from .env
-
-    while True:
-        inserted = is_floppy_disk_inserted(drive_letter)
-        log_message(f"Disk Inserted: {inserted}")
-
-        if inserted and not disk_inserted:
-            # Disk was inserted
-            log_message("Disk inserted")
-            unique_id = read_unique_id(drive_letter)
-            if not unique_id:
-                # If unique_id.txt does not exist, generate and write it
-                unique_id = generate_unique_id()
-                write_unique_id(drive_letter, unique_id)
-                log_message(f"Generated new unique ID for disk: {unique_id}")
-
-            if unique_id != current_unique_id:
-                # Play a new playlist
-                uri_or_url = get_spotify_uri_from_floppy(drive_letter)
-                if uri_or_url:
-                    uri = parse_spotify_uri(uri_or_url)
-                    if uri:
-                        item_name = get_spotify_item_name(uri)
-                        if item_name:
-                            log_message(f"Playing {item_name} ({uri})")
-                        else:
-                            log_message(f"Playing URI: {uri}")
-                        play_spotify_uri(uri)
-                        current_unique_id = unique_id
-                        log_message(f"Internal unique ID set to: {current_unique_id}")
-        elif not inserted and disk_inserted:
-            # Disk was removed
-            log_message("Disk removed")
-            stop_playback()
-            current_unique_id = None  # Clear the unique ID
-            log_message("Internal unique ID cleared.")
-        elif inserted and disk_inserted:
-            # Disk is still inserted
-            # Optional: Check if the unique_id.txt has changed unexpectedly
-            pass  # No action needed as unique_id is already set
-
-        disk_inserted = inserted
-        time.sleep(5)  # Adjust polling interval as needed
+    drives = parse_drives()
+    if len(drives) > 1:
+        log_message(f"Jukebox mode: watching {len(drives)} drives.")
+    DriveManager(drives).run()
 
 # ----------------------------
-# Entry Point
+# Startup
 # ----------------------------
 
-if __name__ == '__main__':
+def connect_spotify():
+    """
+    Authenticates and discovers devices with a single devices() call. Returns
+    False if LOCAL_DEVICE_ID is not available.
+    """
     log_message("Starting authentication...")
-    # Perform authentication
-    authenticate_spotify()
+    with startup_profiler.span('auth'):
+        authenticate_spotify()
 
     log_message("Authentication complete. Listing devices...")
-    # List available devices
-    list_devices()
+    with startup_profiler.span('devices'):
+        list_devices()
 
-    # Ensure that LOCAL_DEVICE_ID is correctly set
+    # Ensure that LOCAL_DEVICE_ID is correctly set (answered from the list just fetched)
     if not is_device_available(LOCAL_DEVICE_ID):
         log_message("Local device ID is not available. Please ensure your device is active in Spotify.")
-        exit(1)
+        return False
+    return True
 
+def start_gui_services():
+    """
+    Connects to Spotify and starts the background threads behind the GUI.
+    Runs off the Tk thread so the window is up while this is in progress.
+    """
+    try:
+        connected = connect_spotify()
+    except Exception as e:
+        log_message(f"Error connecting to Spotify: {e}")
+        connected = False
+    if not connected:
+        report_error("Device Error", "Could not connect to your Spotify device. Check LOCAL_DEVICE_ID in the .env file.")
+        state_queue.put({'track': 'Not connected'})
+        return
+    start_player_services()
+
+def start_player_services():
+    """Starts the disk monitor and the playback threads; returns the playback monitor."""
     log_message("Starting floppy disk monitoring thread...")
     # Start the floppy disk monitoring in a separate thread
     monitoring_thread = threading.Thread(target=main)
     monitoring_thread.daemon = True
     monitoring_thread.start()
 
-    log_message("Initializing GUI...")
-    # Start the GUI
-    root = tk.Tk()
-    app = FloppifyPlayer(root)
-    log_message("GUI initialized. Running main loop.")
-    root.mainloop()
+    # Player buttons queue their Spotify calls here instead of blocking the GUI
+    command_dispatcher.start()
+
+    log_message("Starting playback state monitor...")
+    cover_prefetcher = CoverPrefetcher()
+    cover_prefetcher.start()
+    playback_reconciler.start()
+    playback_monitor = PlaybackStateMonitor(prefetcher=cover_prefetcher, reconciler=playback_reconciler)
+    playback_monitor.start()
+    return playback_monitor
+
+def emit_startup_profile(destination):
+    """Prints the startup timeline ('-') or exports it as JSON to a file."""
+    if destination == '-':
+        log_message(startup_profiler.report())
+    else:
+        startup_profiler.export(destination)
+        log_message(f"Startup timeline written to {destination}")
+
+startup_profiler.mark('import')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Retro Floppy Disk Spotify Playlist Loader")
+    parser.add_argument('--headless', action='store_true',
+                        help="run the floppy monitor without the GUI (Tk and PIL are never imported)")
+    parser.add_argument('--startup-profile', nargs='?', const='-', metavar='FILE',
+                        help="print the startup timeline, or write it as JSON to FILE")
+    return parser.parse_args()
+
+# ----------------------------
+# Entry Point
+# ----------------------------
+
+if __name__ == '__main__':
+    # Let floppify_gui's `import floppify` reuse this module instead of loading a second copy
+    sys.modules.setdefault('floppify', sys.modules[__name__])
+    args = parse_args()
+    start_metrics_services()
+
+    if args.headless:
+        gui_log_enabled = False
+        if not connect_spotify():
+            exit(1)
+        if args.startup_profile:
+            emit_startup_profile(args.startup_profile)
+        log_message("Running headless. Monitoring floppy disk...")
+        main()
+    else:
+        log_message("Initializing GUI...")
+        with startup_profiler.span('gui_import'):
+            # Imported here so headless mode never loads Tk
+            from floppify_gui import preload_assets, run_gui
+        # Decode button images while authentication and device discovery run
+        preload_assets()
+        threading.Thread(target=start_gui_services, daemon=True).start()
+        if args.startup_profile:
+            startup_profiler.on_complete(('first_paint', 'devices'),
+                                         lambda: emit_startup_profile(args.startup_profile))
+        run_gui()
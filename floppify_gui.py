@@ -0,0 +1,978 @@
+"""
+Floppify's Winamp-style Tk GUI. Imported only when the GUI is wanted, so
+headless mode never loads Tk or PIL.ImageTk.
+"""
+import bisect
+import logging
+import os
+import queue
+import threading
+import time
+import tkinter as tk
+from tkinter import messagebox
+import tkinter.font as tkFont
+from collections import OrderedDict, deque
+import numpy as np
+from PIL import Image, ImageTk
+
+import floppify
+from floppify import (
+    ALBUM_COVER_SIZE,
+    GUI_TICK_MS,
+    command_dispatcher,
+    log_message,
+    log_queue,
+    metrics,
+    next_repeat_state,
+    playback_clock,
+    playback_reconciler,
+    sp,
+    startup_profiler,
+    state_queue,
+)
+
+LOG_PANEL_LINES = 10  # Lines kept in the GUI log panel
+LOG_MESSAGES_PER_TICK = 50  # Cap on log messages drained per GUI tick
+VISUALISER_BARS = 19  # Winamp's classic spectrum analyser bar count
+VISUALISER_SIZE = (150, 32)  # 19 bars of 6 px with 2 px gaps, 32 px tall
+
+# ----------------------------
+# Image Assets
+# ----------------------------
+
+IMAGE_DIR = "./images"
+
+# Images the GUI uses, with the size each is displayed at
+IMAGE_ASSETS = {
+    'floppify_logo.png': (30, 30),
+    'minimize.png': (20, 20),
+    'close.png': (20, 20),
+    'floppy_disk.png': (200, 200),
+    'volume_down.png': (30, 30),
+    'volume_up.png': (30, 30),
+    'previous.png': (50, 40),
+    'play.png': (50, 40),
+    'pause.png': (50, 40),
+    'next.png': (50, 40),
+    'shuffle.png': (120, 30),
+    'loop.png': (60, 30),
+}
+
+_preloaded_images = {}  # (name, size) -> resized PIL image, or the exception raised loading it
+_preload_started = threading.Event()
+_preload_done = threading.Event()
+
+def decode_image(name, size):
+    image = Image.open(os.path.join(IMAGE_DIR, name)).convert("RGBA")
+    return image.resize(size, Image.Resampling.LANCZOS)
+
+def preload_assets():
+    """Decodes and resizes every image asset on a worker thread (PIL does not need Tk)."""
+    def worker():
+        with startup_profiler.span('assets'):
+            for name, size in IMAGE_ASSETS.items():
+                try:
+                    _preloaded_images[(name, size)] = decode_image(name, size)
+                except Exception as e:
+                    _preloaded_images[(name, size)] = e
+        _preload_done.set()
+    _preload_started.set()
+    threading.Thread(target=worker, name='assets', daemon=True).start()
+
+def load_image(name, size):
+    """
+    Returns a resized image asset, waiting for the preloader if it is running.
+    Raises FileNotFoundError just like Image.open for missing files.
+    """
+    if _preload_started.is_set() and (name, size) in IMAGE_ASSETS.items():
+        _preload_done.wait()
+    result = _preloaded_images.get((name, size))
+    if result is None:
+        return decode_image(name, size)
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+# ----------------------------
+# Frame Scheduler for Animations
+# ----------------------------
+
+class FrameScheduler:
+    """
+    Drives every animated widget from a single Tk after() chain. Animations
+    register a callback taking the frame time; the chain stops when none are
+    registered, so an idle window costs nothing.
+    """
+
+    def __init__(self, root, interval_ms=33):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.animations = []
+        self.after_id = None
+
+    def register(self, callback):
+        if callback not in self.animations:
+            self.animations.append(callback)
+        if self.after_id is None:
+            self.after_id = self.root.after(self.interval_ms, self.tick)
+
+    def unregister(self, callback):
+        if callback in self.animations:
+            self.animations.remove(callback)
+        if not self.animations and self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def tick(self):
+        now = time.monotonic()
+        for callback in list(self.animations):
+            callback(now)
+        self.after_id = self.root.after(self.interval_ms, self.tick) if self.animations else None
+
+# ----------------------------
+# Marquee Class for Scrolling Text
+# ----------------------------
+
+class Marquee(tk.Canvas):
+    """
+    Scrolling text on a canvas. The text is laid out once per change and then
+    moved by pixel offset on each scheduler frame, without relayout.
+    """
+
+    def __init__(self, parent, text, font, width, fg, bg, delay=150, scheduler=None):
+        self.font_obj = tkFont.Font(font=font)
+        char_width = self.font_obj.measure('0')
+        height = self.font_obj.metrics('linespace')
+        super().__init__(parent, width=char_width * width, height=height, bg=bg, highlightthickness=0, bd=0)
+        self.fg = fg
+        self.speed = char_width * 1000 / delay  # pixels per second: one character every `delay` ms
+        self.scheduler = scheduler or FrameScheduler(self)
+        self.original_text = None
+        self.text_width = 0
+        self.period = 0  # Distance after which the scrolling text repeats
+        self.offset = 0.0
+        self.last_frame = None
+        self.scroll_active = False
+        self.text_items = []
+        self.bind('<Configure>', self.check_scroll)
+        self.set_text(text)
+
+    def set_text(self, text):
+        if text == self.original_text:
+            return
+        self.original_text = text
+        self.stop_scroll()
+        self.delete('all')
+        # Measure and lay out the text once per change
+        self.text_width = self.font_obj.measure(text)
+        self.period = self.text_width + self.font_obj.measure('   ')  # Add spaces for smooth scrolling
+        y = int(self['height']) // 2
+        self.text_items = [
+            self.create_text(0, y, text=text, font=self.font_obj, fill=self.fg, anchor='w'),
+            self.create_text(self.period, y, text=text, font=self.font_obj, fill=self.fg, anchor='w', state='hidden'),
+        ]
+        self.check_scroll()
+
+    def check_scroll(self, event=None):
+        label_width = self.winfo_width() if self.winfo_width() > 1 else int(self['width'])
+        if self.text_width > label_width:
+            if not self.scroll_active:
+                self.scroll_active = True
+                self.offset = 0.0
+                self.last_frame = None
+                self.itemconfigure(self.text_items[1], state='normal')
+                self.scheduler.register(self.animate)
+        else:
+            self.stop_scroll()
+
+    def stop_scroll(self):
+        if self.scroll_active:
+            self.scroll_active = False
+            self.scheduler.unregister(self.animate)
+        if self.text_items:
+            self.offset = 0.0
+            self.move_text()
+            self.itemconfigure(self.text_items[1], state='hidden')
+
+    def animate(self, now):
+        if self.last_frame is not None:
+            self.offset = (self.offset + self.speed * (now - self.last_frame)) % self.period
+        self.last_frame = now
+        self.move_text()
+
+    def move_text(self):
+        y = int(self['height']) // 2
+        x = -round(self.offset)
+        self.coords(self.text_items[0], x, y)
+        self.coords(self.text_items[1], x + self.period, y)
+
+# ----------------------------
+# Gradient Background Canvas (Horizontal Gradient)
+# ----------------------------
+
+class GradientCanvas(tk.Canvas):
+    # Rendered gradients shared by all canvases: (width, height, colors) -> PIL image
+    _cache = OrderedDict()
+    _cache_size = 8
+
+    def __init__(self, parent, width, height, color1, color2, color3, **kwargs):
+        super().__init__(parent, width=width, height=height, highlightthickness=0, **kwargs)
+        self.width = width
+        self.height = height
+        self.color1 = color1
+        self.color2 = color2
+        self.color3 = color3
+        self.gradient_photo = None
+        self.gradient_item = None
+        self.resize_after_id = None
+        self.create_gradient()
+        self.bind('<Configure>', self.on_configure)
+
+    def create_gradient(self):
+        """Shows the three-phase horizontal gradient as a single canvas image item."""
+        image = self.render_gradient(self.width, self.height, (self.color1, self.color2, self.color3))
+        self.gradient_photo = ImageTk.PhotoImage(image)
+        if self.gradient_item is None:
+            self.gradient_item = self.create_image(0, 0, image=self.gradient_photo, anchor='nw')
+            self.tag_lower(self.gradient_item)
+        else:
+            self.itemconfigure(self.gradient_item, image=self.gradient_photo)
+
+    @classmethod
+    def render_gradient(cls, width, height, colors):
+        """Renders the gradient with vectorised interpolation, caching the result."""
+        key = (width, height, colors)
+        if key in cls._cache:
+            cls._cache.move_to_end(key)
+            return cls._cache[key]
+        stops = np.array([cls.hex_to_rgb(color) for color in colors], dtype=np.float64)
+        x = np.arange(width)
+        positions = [0, width / 2, width]  # color1 -> color2 over the first half, color2 -> color3 over the second
+        row = np.stack([np.interp(x, positions, stops[:, channel]) for channel in range(3)], axis=-1)
+        pixels = np.ascontiguousarray(np.broadcast_to(row.astype(np.uint8), (height, width, 3)))
+        image = Image.fromarray(pixels, 'RGB')
+        cls._cache[key] = image
+        while len(cls._cache) > cls._cache_size:
+            cls._cache.popitem(last=False)
+        return image
+
+    def on_configure(self, event):
+        """Re-renders the gradient when the canvas is resized (coalescing bursts of events)."""
+        if (event.width, event.height) == (self.width, self.height):
+            return
+        self.width, self.height = event.width, event.height
+        if self.resize_after_id:
+            self.after_cancel(self.resize_after_id)
+        self.resize_after_id = self.after(50, self.on_resize_settled)
+
+    def on_resize_settled(self):
+        self.resize_after_id = None
+        self.create_gradient()
+
+    @staticmethod
+    def hex_to_rgb(hex_color):
+        """Converts hex color to RGB tuple."""
+        hex_color = hex_color.lstrip('#')
+        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2 ,4))
+
+# ----------------------------
+# Spectrum Visualiser
+# ----------------------------
+
+def format_time(seconds):
+    """Formats seconds as m:ss."""
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}:{seconds:02d}"
+
+class SpectrumTimeline:
+    """
+    Per-track visualiser data, built once from Spotify's audio analysis: the
+    segment start times, each segment's loudness envelope, and a bar shape
+    per segment derived from its timbre coefficients.
+    """
+
+    def __init__(self, analysis, bars=VISUALISER_BARS):
+        segments = analysis.get('segments') or []
+        if not segments:
+            raise ValueError("audio analysis has no segments")
+        self.starts = [segment['start'] for segment in segments]  # Plain list for bisect
+        starts = np.array(self.starts)
+        self.end = starts[-1] + segments[-1].get('duration', 0)
+        self.durations = np.append(np.diff(starts), self.end - starts[-1])
+        self.loudness_start = np.array([segment.get('loudness_start', -60.0) for segment in segments])
+        self.loudness_max = np.array([segment.get('loudness_max', -60.0) for segment in segments])
+        self.max_time = np.array([segment.get('loudness_max_time', 0.0) for segment in segments])
+        # Each segment decays towards the next one's starting loudness
+        self.loudness_end = np.append(self.loudness_start[1:], -60.0)
+
+        # Timbre is an MFCC-like spectral envelope: standardise each coefficient over the
+        # track and project it back through a cosine basis to get one height per bar.
+        # Coefficient 0 is loudness, which the envelope already covers.
+        timbre = np.array([segment.get('timbre') or [0.0] * 12 for segment in segments], dtype=np.float64)
+        standardised = (timbre - timbre.mean(axis=0)) / (timbre.std(axis=0) + 1e-6)
+        basis = np.cos(np.pi * np.outer(np.arange(bars) + 0.5, np.arange(12)) / bars)
+        basis[:, 0] = 0.0
+        shape = 1.0 / (1.0 + np.exp(-(standardised @ basis.T) / 2.0))
+        self.shapes = (0.35 + 0.65 * shape).astype(np.float32)  # (segments, bars)
+
+    def levels(self, position):
+        """Bar heights (0..1) at a position in seconds, or None outside the track."""
+        index = bisect.bisect_right(self.starts, position) - 1
+        if index < 0 or position >= self.end:
+            return None
+        offset = position - self.starts[index]
+        peak_at = self.max_time[index]
+        if offset < peak_at:
+            loudness = self.loudness_start[index] + (self.loudness_max[index] - self.loudness_start[index]) * offset / peak_at
+        else:
+            decay = max(self.durations[index] - peak_at, 1e-3)
+            loudness = self.loudness_max[index] + (self.loudness_end[index] - self.loudness_max[index]) * min((offset - peak_at) / decay, 1.0)
+        level = min(max((loudness + 60.0) / 60.0, 0.0), 1.0)  # -60..0 dB
+        return self.shapes[index] * level
+
+class SpectrumRenderer:
+    """
+    Draws all bars and their peak caps into one RGB frame in a single
+    vectorised pass; nothing here touches Tk.
+    """
+
+    def __init__(self, bars=VISUALISER_BARS, size=VISUALISER_SIZE, bg='#030303', bar_width=6, gap=2):
+        self.bars = bars
+        self.width, self.height = size
+        columns = np.arange(self.width)
+        bar = columns // (bar_width + gap)
+        in_bar = (columns % (bar_width + gap) < bar_width) & (bar < bars)
+        self.column_bar = np.where(in_bar, bar, bars)  # Gap columns read an always-empty extra bar
+        rows = np.arange(self.height)[:, None]
+        self.rows = rows
+        self.row_height = self.height - rows  # Bar height needed to light each row
+        # Winamp palette: green at the bottom through yellow to red at the top
+        fraction = (self.height - 1 - rows[:, 0]) / max(self.height - 1, 1)
+        self.palette = np.stack([np.interp(fraction, (0, 0.5, 1), (0, 255, 255)),
+                                 np.interp(fraction, (0, 0.5, 1), (200, 220, 32)),
+                                 np.zeros(self.height)], axis=-1).astype(np.uint8)[:, None, :]
+        self.bg = np.array(GradientCanvas.hex_to_rgb(bg), dtype=np.uint8)
+        self.peak_color = np.array((200, 200, 200), dtype=np.uint8)
+
+    def render(self, levels, peaks):
+        """Returns a (height, width, 3) uint8 frame for bar levels and peak positions in 0..1."""
+        heights = np.append(np.round(levels * self.height), 0)[self.column_bar]
+        peak_rows = np.append(np.round((1 - peaks) * (self.height - 1)), -1)[self.column_bar]
+        peak_rows[np.append(peaks <= 0, True)[self.column_bar]] = -1
+        frame = np.where((self.row_height <= heights)[..., None], self.palette, self.bg)
+        frame[self.rows == peak_rows] = self.peak_color
+        return frame
+
+class Visualiser(tk.Label):
+    """
+    Winamp-style spectrum analyser. Follows the PlaybackClock's interpolated
+    position through the current track's SpectrumTimeline and writes each
+    frame into one PhotoImage in place. It is on the shared FrameScheduler
+    only while there is something to animate.
+    """
+
+    FALL_RATE = 2.5  # Full bar heights per second a bar can drop
+    PEAK_FALL_RATE = 0.6
+
+    def __init__(self, parent, scheduler, clock=playback_clock, bars=VISUALISER_BARS, size=VISUALISER_SIZE,
+                 bg='#030303'):
+        self.renderer = SpectrumRenderer(bars, size, bg)
+        self.photo = ImageTk.PhotoImage(Image.new('RGB', size, bg))
+        super().__init__(parent, image=self.photo, bg=bg, bd=0, highlightthickness=0)
+        self.scheduler = scheduler
+        self.clock = clock
+        self.levels = np.zeros(bars, dtype=np.float32)
+        self.peaks = np.zeros(bars, dtype=np.float32)
+        self.timeline = None
+        self.timeline_track = None
+        self.loading_track = None
+        self.loaded = None  # (track_id, timeline or None) handed over by the loader thread
+        self.analysis_available = True  # Cleared when Spotify refuses audio analysis to this app
+        self.last_frame = None
+
+    def wake(self):
+        """Starts animating, e.g. after a track change or resume."""
+        self.last_frame = None
+        self.scheduler.register(self.animate)
+
+    def load_timeline(self, track_id):
+        """Fetches and precomputes the track's timeline off the Tk thread."""
+        self.loading_track = track_id
+
+        def worker():
+            try:
+                timeline = SpectrumTimeline(sp.audio_analysis(track_id), self.renderer.bars)
+            except Exception as e:
+                if getattr(e, 'http_status', None) == 403:
+                    self.analysis_available = False
+                log_message(f"No audio analysis for the visualiser: {e}", level=logging.DEBUG)
+                timeline = None
+            self.loaded = (track_id, timeline)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def animate(self, now):
+        if self.loaded is not None:
+            (self.timeline_track, self.timeline), self.loaded = self.loaded, None
+            self.loading_track = None
+        track_id = self.clock.track_id
+        if track_id and track_id not in (self.timeline_track, self.loading_track) and self.analysis_available:
+            self.load_timeline(track_id)
+
+        target = None
+        if self.clock.is_playing and self.timeline is not None and track_id == self.timeline_track:
+            target = self.timeline.levels(self.clock.position(now))
+        dt = 0.0 if self.last_frame is None else now - self.last_frame
+        self.last_frame = now
+        # Bars jump up to the music but fall back at a fixed rate, as in Winamp
+        np.maximum(self.levels - self.FALL_RATE * dt, 0.0 if target is None else target, out=self.levels)
+        np.clip(self.levels, 0.0, 1.0, out=self.levels)
+        np.maximum(self.peaks - self.PEAK_FALL_RATE * dt, self.levels, out=self.peaks)
+        self.photo.paste(Image.fromarray(self.renderer.render(self.levels, self.peaks), 'RGB'))
+
+        animating = self.clock.is_playing and (self.timeline is not None or self.loading_track is not None)
+        if not animating and not self.peaks.any():
+            self.scheduler.unregister(self.animate)
+
+# ----------------------------
+# Custom Title Bar
+# ----------------------------
+
+class CustomTitleBar(tk.Frame):
+    def __init__(self, master, *args, **kwargs):
+        super().__init__(master, bg='#191925')  
+        self.master = master
+        self.init_widgets()
+        self.bind_events()
+
+    def init_widgets(self):
+        # Floppify Logo
+        try:
+            logo_image = load_image("floppify_logo.png", (30, 30))
+            self.logo_photo = ImageTk.PhotoImage(logo_image)
+            self.logo_label = tk.Label(self, image=self.logo_photo, bg='#191925')
+            self.logo_label.pack(side='left', padx=5)
+        except FileNotFoundError:
+            self.logo_label = tk.Label(self, text="FLOPPIFY", bg='#191925', fg='white', font=('Arial', 12, 'bold'))
+            self.logo_label.pack(side='left', padx=5)
+
+        # Window Title
+        self.title_label = tk.Label(self, text="FLOPPIFY", bg='#191925', fg='white', font=('LED Dot-Matrix', 12))
+        self.title_label.pack(side='left', padx=5)
+
+        # Spacer
+        self.spacer = tk.Label(self, bg='#191925')
+        self.spacer.pack(side='left', expand=True, fill='x')
+
+        # Minimize and Close Buttons
+        try:
+            minimize_image = load_image("minimize.png", (20, 20))
+            self.minimize_photo = ImageTk.PhotoImage(minimize_image)
+            self.minimize_button = tk.Button(self, image=self.minimize_photo, bg='#191925', bd=0, activebackground='#006400', command=self.minimize_window)
+            self.minimize_button.pack(side='right', padx=2)
+
+            close_image = load_image("close.png", (20, 20))
+            self.close_photo = ImageTk.PhotoImage(close_image)
+            self.close_button = tk.Button(self, image=self.close_photo, bg='#191925', bd=0, activebackground='#006400', command=self.master.destroy)
+            self.close_button.pack(side='right', padx=2)
+        except FileNotFoundError:
+            self.minimize_button = tk.Button(self, text="_", bg='#191925', fg='white', bd=0, command=self.minimize_window)
+            self.minimize_button.pack(side='right', padx=2)
+            self.close_button = tk.Button(self, text="X", bg='#191925', fg='white', bd=0, command=self.master.destroy)
+            self.close_button.pack(side='right', padx=2)
+
+    def bind_events(self):
+        self.bind("<ButtonPress-1>", self.start_move)
+        self.bind("<ButtonRelease-1>", self.stop_move)
+        self.bind("<B1-Motion>", self.on_move)
+
+        self.logo_label.bind("<ButtonPress-1>", self.start_move)
+        self.logo_label.bind("<ButtonRelease-1>", self.stop_move)
+        self.logo_label.bind("<B1-Motion>", self.on_move)
+
+        self.title_label.bind("<ButtonPress-1>", self.start_move)
+        self.title_label.bind("<ButtonRelease-1>", self.stop_move)
+        self.title_label.bind("<B1-Motion>", self.on_move)
+
+    def minimize_window(self):
+        self.master.iconify()
+
+    def start_move(self, event):
+        self.x = event.x
+        self.y = event.y
+
+    def stop_move(self, event):
+        self.x = None
+        self.y = None
+
+    def on_move(self, event):
+        deltax = event.x - self.x
+        deltay = event.y - self.y
+        x = self.master.winfo_x() + deltax
+        y = self.master.winfo_y() + deltay
+        self.master.geometry(f"+{x}+{y}")
+
+# ----------------------------
+#  Floppify Player GUI
+# ----------------------------
+
+class FloppifyPlayer:
+    def __init__(self, master):
+        self.master = master
+        # Set window size to 550x450 and allow resizing
+        self.master.geometry("550x450")
+        self.master.resizable(True, True)
+        self.master.overrideredirect(True)  # Remove default window decorations
+
+        # Initialize Gradient Background
+        self.gradient = GradientCanvas(master, width=550, height=450, color1='#191925', color2='#31314f', color3='#1c1c2c')
+        self.gradient.place(x=0, y=0, relwidth=1, relheight=1)  # Follow window resizes
+
+        # Initialize Custom Title Bar
+        self.title_bar = CustomTitleBar(master)
+        self.title_bar.place(x=0, y=0, width=550, height=40)
+
+        # Define font styles
+        try:
+            label_font = ('LED Dot-Matrix', 10)  # Ensure this font is installed
+            text_font = ('LED Dot-Matrix', 16)
+        except:
+            # Fallback to default font if custom font not available
+            label_font = ('Courier', 10)
+            text_font = ('Courier', 16)
+
+        # ------------------------
+        # Layout Frames with Reverse Bevel
+        # ------------------------
+        bevel_options = {'relief': 'sunken', 'bd': 2, 'bg': '#1f1f2e'}  # Dark grey background
+        bevel_options_text = {'relief': 'sunken', 'bd': 2, 'bg': '#191925'}  # Dark grey background
+
+        self.right_frame = tk.Frame(master, **bevel_options)
+        self.right_frame.place(x=230, y=60, width=300, height=200)
+
+        self.buttons_frame = tk.Frame(master, **bevel_options)
+        self.buttons_frame.place(x=20, y=270, width=510, height=60)
+
+        self.log_frame = tk.Frame(master, **bevel_options)
+        self.log_frame.place(x=20, y=350, width=510, height=80)
+
+        # ------------------------
+        # Left Section: Floppy Disk with Album Cover (Placed Directly on Gradient)
+        # ------------------------
+        try:
+            floppy_image = load_image("floppy_disk.png", (200, 200))
+            self.floppy_photo = ImageTk.PhotoImage(floppy_image)
+            # Place floppy_label directly on the gradient canvas with dark grey background
+            self.floppy_label = tk.Label(master, image=self.floppy_photo, bg='#1f1f2e', relief='sunken', bd=1)
+            self.floppy_label.image = self.floppy_photo  # Prevent garbage collection
+            # Position the floppy_label at (120, 160)
+            self.gradient.create_window(120, 160, window=self.floppy_label)
+        except FileNotFoundError:
+            # If the image is not found, display a placeholder text directly on the gradient
+            self.floppy_label = tk.Label(master, text="Floppy Disk", fg='#FFFFFF', bg='#1f1f2e', font=('Arial', 12))
+            self.gradient.create_window(120, 160, window=self.floppy_label)
+
+        # Placeholder for Album Cover (Placed Directly on Gradient) - COVER LOCATION
+        # One PhotoImage for the window's lifetime: each new cover is pasted into it in place,
+        # so weeks of track changes never grow Tk's image table
+        self.album_cover_photo = ImageTk.PhotoImage('RGBA', ALBUM_COVER_SIZE)
+        self.album_cover_shown = False
+        self.album_cover_label = tk.Label(master, bg='#1f1f2e')
+        self.gradient.create_window(120, 120, window=self.album_cover_label)  # Adjust coordinates as needed
+
+        # One frame scheduler drives all animated widgets
+        self.scheduler = FrameScheduler(master)
+
+        # ----------------------------
+        # Right Frame: Track, Artist, Album Information
+        # ----------------------------
+        # Track Information
+        track_frame = tk.Frame(self.right_frame, bg='#1f1f2e')
+        track_frame.pack(anchor='nw', pady=(10,0), fill='x')
+
+        track_static = tk.Label(track_frame, text='TRK:', font=label_font, fg='cyan', bg='#1f1f2e')
+        track_static.pack(side='left', padx=5)
+
+        self.track_marquee = Marquee(track_frame, text='Connecting...', font=text_font, width=25, fg='#00FF00', bg='#030303', scheduler=self.scheduler)
+        self.track_marquee.pack(side='left', padx=5)
+
+        # Artist Information
+        artist_frame = tk.Frame(self.right_frame, bg='#1f1f2e')
+        artist_frame.pack(anchor='nw', pady=0, fill='x')
+
+        artist_static = tk.Label(artist_frame, text='ART:', font=label_font, fg='cyan', bg='#1f1f2e')
+        artist_static.pack(side='left', padx=5)
+
+        self.artist_marquee = Marquee(artist_frame, text='', font=text_font, width=25, fg='#00FF00', bg='#030303', scheduler=self.scheduler)
+        self.artist_marquee.pack(side='left', padx=5)
+
+        # Album Information
+        album_frame = tk.Frame(self.right_frame, bg='#1f1f2e')
+        album_frame.pack(anchor='nw', pady=0, fill='x')
+
+        album_static = tk.Label(album_frame, text='ALB:', font=label_font, fg='cyan', bg='#1f1f2e')
+        album_static.pack(side='left', padx=5)
+
+        self.album_marquee = Marquee(album_frame, text='', font=text_font, width=25, fg='#00FF00', bg='#030303', scheduler=self.scheduler)
+        self.album_marquee.pack(side='left', padx=5)
+
+        # ------------------------
+        # Additional Information: kbps and kHz
+        # ------------------------
+        info_frame = tk.Frame(self.right_frame, bg='#1f1f2e')
+        info_frame.pack(anchor='nw', pady=5, fill='x')
+
+        kbps_label = tk.Label(info_frame, text='KBPS:', font=label_font, fg='cyan', bg='#1f1f2e')
+        kbps_label.pack(side='left', padx=5)
+
+        self.kbps_var = tk.StringVar(value="190")
+        self.kbps_display = tk.Label(info_frame, textvariable=self.kbps_var, font=text_font, fg='#00FF00', bg='#030303')
+        self.kbps_display.pack(side='left', padx=5)
+
+        khz_label = tk.Label(info_frame, text='KHZ:', font=label_font, fg='cyan', bg='#1f1f2e')
+        khz_label.pack(side='left', padx=15)
+
+        self.khz_var = tk.StringVar(value="44")
+        self.khz_display = tk.Label(info_frame, textvariable=self.khz_var, font=text_font, fg='#00FF00', bg='#030303')
+        self.khz_display.pack(side='left', padx=5)
+
+        # ----------------------------
+        # Volume Control: 11 Segments with Gradient and Buttons
+        # ----------------------------
+        volume_frame = tk.Frame(self.right_frame, bg='#1f1f2e')
+        volume_frame.pack(pady=(10, 0), fill='x')
+
+        # Volume Down Button
+        try:
+            volume_down_image = load_image("volume_down.png", (30, 30))
+            self.volume_down_photo = ImageTk.PhotoImage(volume_down_image)
+            self.volume_down_button = tk.Button(volume_frame, image=self.volume_down_photo, bg='#1f1f2e', bd=0, activebackground='#696969', command=self.decrease_volume)
+            self.volume_down_button.pack(side='left', padx=5)
+        except FileNotFoundError:
+            self.volume_down_button = tk.Button(volume_frame, text="↓", bg='#1f1f2e', fg='#00FF00', bd=0, font=('Arial', 12), command=self.decrease_volume)
+            self.volume_down_button.pack(side='left', padx=5)
+
+        # Volume Segments
+        self.volume_segments = []
+        segment_width = 20
+        segment_height = 20
+        spacing = 2
+        for i in range(11):
+            frame = tk.Frame(volume_frame, width=segment_width, height=segment_height, bg='#1f1f2e', relief='raised', bd=1)
+            frame.pack(side='left', padx=1)
+            self.volume_segments.append(frame)
+
+        # Volume Up Button
+        try:
+            volume_up_image = load_image("volume_up.png", (30, 30))
+            self.volume_up_photo = ImageTk.PhotoImage(volume_up_image)
+            self.volume_up_button = tk.Button(volume_frame, image=self.volume_up_photo, bg='#1f1f2e', bd=0, activebackground='#696969', command=self.increase_volume)
+            self.volume_up_button.pack(side='left', padx=5)
+        except FileNotFoundError:
+            self.volume_up_button = tk.Button(volume_frame, text="↑", bg='#1f1f2e', fg='#00FF00', bd=0, font=('Arial', 12), command=self.increase_volume)
+            self.volume_up_button.pack(side='left', padx=5)
+
+        # Spectrum visualiser and track time below the volume bar
+        visualiser_frame = tk.Frame(self.right_frame, bg='#1f1f2e')
+        visualiser_frame.pack(anchor='nw', pady=(6, 0), fill='x')
+
+        self.visualiser = Visualiser(visualiser_frame, self.scheduler)
+        self.visualiser.pack(side='left', padx=10)
+
+        # Elapsed time, interpolated locally between polls; click to show the time remaining instead
+        self.show_remaining = False
+        self.time_text = ''
+        self.time_var = tk.StringVar(value='')
+        self.time_display = tk.Label(visualiser_frame, textvariable=self.time_var, font=text_font, fg='#00FF00', bg='#030303', width=6, anchor='e')
+        self.time_display.pack(side='left', padx=5)
+        self.time_display.bind('<Button-1>', self.toggle_time_mode)
+
+        # Initialize current volume and playback state (filled in by the state monitor)
+        self.current_volume = 50  # Default volume
+        self.is_playing = False
+        self.shuffle_state = None
+        self.repeat_state = None
+        self.update_volume_segments(self.current_volume)
+
+        # ----------------------------
+        # Buttons Frame: Shuffle, Loop, Previous, Play/Pause, Next
+        # ----------------------------
+        # Load button images
+        try:
+            self.prev_img = ImageTk.PhotoImage(load_image("previous.png", (50, 40)))
+            self.play_img = ImageTk.PhotoImage(load_image("play.png", (50, 40)))
+            self.pause_img = ImageTk.PhotoImage(load_image("pause.png", (50, 40)))
+            self.next_img = ImageTk.PhotoImage(load_image("next.png", (50, 40)))
+            self.shuffle_img = ImageTk.PhotoImage(load_image("shuffle.png", (120, 30)))
+            self.loop_img = ImageTk.PhotoImage(load_image("loop.png", (60, 30)))
+        except FileNotFoundError as e:
+            messagebox.showerror("Image Error", f"Button image not found: {e}")
+            return
+
+        # Previous Button
+        self.prev_button = tk.Button(
+            self.buttons_frame, image=self.prev_img, bg='#1f1f2e', bd=0, activebackground='#696969',
+            command=lambda: command_dispatcher.submit('skip', -1)
+        )
+        self.prev_button.pack(side='left', padx=1)
+
+        # Play/Pause Button
+        self.play_pause_button = tk.Button(
+            self.buttons_frame, image=self.play_img, bg='#1f1f2e', bd=0, activebackground='#696969',
+            command=self.on_play_pause
+        )
+        self.play_pause_button.pack(side='left', padx=1)
+
+        # Next Button
+        self.next_button = tk.Button(
+            self.buttons_frame, image=self.next_img, bg='#1f1f2e', bd=0, activebackground='#696969',
+            command=lambda: command_dispatcher.submit('skip', 1)
+        )
+        self.next_button.pack(side='left', padx=1)
+
+        # Shuffle Button
+        self.shuffle_button = tk.Button(
+            self.buttons_frame, image=self.shuffle_img, bg='#1f1f2e', bd=0, activebackground='#696969',
+            command=self.toggle_shuffle
+        )
+        self.shuffle_button.pack(side='left', padx=30)
+
+        # Loop Button
+        self.loop_button = tk.Button(
+            self.buttons_frame, image=self.loop_img, bg='#1f1f2e', bd=0, activebackground='#696969',
+            command=self.toggle_loop
+        )
+        self.loop_button.pack(side='left', padx=1)
+
+        # ----------------------------
+        # Log Frame: Console/Message Log
+        # ----------------------------
+        # Create a Text widget for logs (read-only)
+        self.log_text = tk.Text(self.log_frame, height=5, width=95, bg='#000000', fg='lime', state='disabled', bd=0, wrap='word', font=('LED Dot-Matrix', 12))
+        self.log_text.pack()
+
+        # Ring buffer mirroring the lines shown in log_text
+        self.log_history = deque(maxlen=LOG_PANEL_LINES)
+        self.last_log_message = None
+
+        # Start the GUI update loop
+        self.update_gui()
+
+    # ----------------------------
+    # Playback Control Methods
+    # ----------------------------
+
+    def on_play_pause(self):
+        previous = self.is_playing
+        self.apply_state({'is_playing': not previous})  # Optimistic update
+        playback_reconciler.set_desired('is_playing', self.is_playing, on_error=self.rollback_on_error('is_playing', previous))
+
+    def toggle_shuffle(self):
+        if self.shuffle_state is None:
+            return
+        previous = self.shuffle_state
+        self.shuffle_state = not previous
+        playback_reconciler.set_desired('shuffle', self.shuffle_state, on_error=self.rollback_on_error('shuffle', previous))
+
+    def toggle_loop(self):
+        if self.repeat_state is None:
+            return
+        previous = self.repeat_state
+        self.repeat_state = next_repeat_state(previous)
+        playback_reconciler.set_desired('repeat', self.repeat_state, on_error=self.rollback_on_error('repeat', previous))
+
+    def rollback_on_error(self, field, previous):
+        """Returns a dispatcher on_error callback that restores field on the Tk thread."""
+        def on_error(error):
+            state_queue.put({'rollback': (field, previous, error)})
+        return on_error
+
+    def rollback(self, field, previous, error):
+        """Undoes an optimistic update after its command failed."""
+        if field == 'volume':
+            self.current_volume = previous
+            self.update_volume_segments(previous)
+        elif field == 'shuffle':
+            self.shuffle_state = previous
+        elif field == 'repeat':
+            self.repeat_state = previous
+        else:
+            self.apply_state({field: previous})
+        messagebox.showerror("Playback Error", str(error))
+
+    # ----------------------------
+    # Volume Control Methods
+    # ----------------------------
+
+    def increase_volume(self):
+        if self.current_volume < 100:
+            self.set_volume(min(self.current_volume + 10, 100))
+
+    def decrease_volume(self):
+        if self.current_volume > 0:
+            self.set_volume(max(self.current_volume - 10, 0))
+
+    def set_volume(self, volume):
+        """Updates the GUI segments at once and hands the new volume to the reconciler."""
+        previous = self.current_volume
+        self.update_volume_segments(volume)
+        self.current_volume = volume
+        playback_reconciler.set_desired('volume', volume, on_error=self.rollback_on_error('volume', previous))
+
+    def update_volume_segments(self, volume):
+        """Updates the visual representation of volume segments."""
+        segments_to_fill = volume // 10
+        for i in range(11):
+            if i <= segments_to_fill:
+                # Apply gradient color
+                color = self.get_gradient_color(i)
+                self.volume_segments[i].config(bg=color)
+            else:
+                self.volume_segments[i].config(bg='#1f1f2e')
+
+    def get_gradient_color(self, segment):
+        """Returns a color based on the segment index for gradient effect."""
+        if 0 <= segment <= 2:
+                return '#006400'  # Dark green for first 3 segments
+        elif 3 <= segment <= 4:
+                return '#00FF00'  # Light green for next 2 segments
+        elif 5 <= segment <= 6:
+                return '#FFFF00'  # Yellow for next 2 segments
+        elif 7 <= segment <= 8:
+                return '#FFA500'  # Orange for next 2 segments
+        elif 9 <= segment <= 10:
+                return '#FF0000'  # Red for last 2 segments
+        else:
+                return '#FF0000'  # Default to Red if out of range
+
+    # ----------------------------
+    # GUI Update Loop
+    # ----------------------------
+
+    def update_gui(self):
+        try:
+            with metrics.timer('gui_tick'):
+                # Process a batch of messages from the log_queue
+                self.drain_log_queue()
+
+                # Apply any playback state changes posted by the monitor thread
+                while not state_queue.empty():
+                    self.apply_state(state_queue.get_nowait())
+
+                self.update_time_display()
+
+        except Exception as e:
+            log_message(f"Error in update_gui: {e}")
+        # Schedule the next update
+        self.master.after(GUI_TICK_MS, self.update_gui)  # Cheap tick: only drains queues
+
+    def update_time_display(self):
+        """Shows the interpolated position as m:ss, or -m:ss remaining; only touches Tk when it changes."""
+        if playback_clock.track_id is None:
+            text = ''
+        elif self.show_remaining and playback_clock.duration:
+            text = '-' + format_time(playback_clock.remaining())
+        else:
+            text = format_time(playback_clock.position())
+        if text != self.time_text:
+            self.time_text = text
+            self.time_var.set(text)
+
+    def toggle_time_mode(self, event=None):
+        self.show_remaining = not self.show_remaining
+        self.update_time_display()
+
+    def drain_log_queue(self):
+        """Appends up to LOG_MESSAGES_PER_TICK new log messages to the panel, trimming the oldest lines."""
+        lines = []
+        for _ in range(LOG_MESSAGES_PER_TICK):
+            try:
+                message = log_queue.get_nowait()
+            except queue.Empty:
+                break
+            # Avoid printing duplicate consecutive messages
+            if message != self.last_log_message:
+                # One history entry per text line, so trimming keeps the widget bounded
+                lines.extend(message.splitlines() or [''])
+                self.last_log_message = message
+        if not lines:
+            return
+
+        self.log_text.config(state='normal')
+        for line in lines[-LOG_PANEL_LINES:]:
+            if len(self.log_history) == self.log_history.maxlen:
+                self.log_text.delete('1.0', '2.0')  # Drop the oldest line
+            self.log_text.insert('end-1c', ('\n' if self.log_history else '') + line)
+            self.log_history.append(line)
+        self.log_text.config(state='disabled')
+        self.log_text.see(tk.END)
+
+    def apply_state(self, delta):
+        """Applies a playback state delta from the PlaybackStateMonitor."""
+        if 'error' in delta:
+            messagebox.showerror(*delta['error'])
+        if 'rollback' in delta:
+            self.rollback(*delta['rollback'])
+        if 'shuffle' in delta:
+            self.shuffle_state = delta['shuffle']
+        if 'repeat' in delta:
+            self.repeat_state = delta['repeat']
+
+        # Update Marquee texts
+        if 'track' in delta:
+            self.track_marquee.set_text(delta['track'])
+        if 'artist' in delta:
+            self.artist_marquee.set_text(delta['artist'])
+        if 'album' in delta:
+            self.album_marquee.set_text(delta['album'])
+
+        # Update Album Cover  -- COVER SIZE
+        if 'cover_image' in delta:
+            # Remove previous album cover if exists
+            cover = delta['cover_image']
+            if cover is None:
+                if self.album_cover_shown:
+                    self.album_cover_label.config(image='')
+                    self.album_cover_shown = False
+            else:
+                if cover.size != ALBUM_COVER_SIZE:
+                    cover = cover.resize(ALBUM_COVER_SIZE, Image.Resampling.LANCZOS)
+                self.album_cover_photo.paste(cover)
+                if not self.album_cover_shown:
+                    self.album_cover_label.config(image=self.album_cover_photo)
+                    self.album_cover_shown = True
+
+        # Update Play/Pause Button Icon and kbps/kHz (fixed values as per user instruction)
+        if 'track' in delta or delta.get('is_playing'):
+            self.visualiser.wake()
+        if 'is_playing' in delta:
+            self.is_playing = delta['is_playing']
+            self.play_pause_button.config(image=self.pause_img if self.is_playing else self.play_img)
+            self.kbps_var.set("190" if self.is_playing else "N/A")
+            self.khz_var.set("44" if self.is_playing else "N/A")
+
+        # Update Volume Segments when the reconciler accepts an external volume change
+        accepted = delta.get('accepted', {})
+        if 'volume' in accepted and accepted['volume'] != self.current_volume:
+            log_message(f"Volume synced from Spotify: {accepted['volume']}%")
+            self.current_volume = accepted['volume']
+            self.update_volume_segments(self.current_volume)
+
+# ----------------------------
+# GUI Entry Point
+# ----------------------------
+
+def show_error(title, message):
+    """Error handler for floppify.report_error: shows the dialog on the Tk thread."""
+    state_queue.put({'error': (title, message)})
+
+def run_gui():
+    floppify.error_handler = show_error
+    with startup_profiler.span('gui'):
+        root = tk.Tk()
+        app = FloppifyPlayer(root)
+    # Idle callbacks run after Tk's pending redraws, i.e. once the window has painted
+    root.after_idle(startup_profiler.mark, 'first_paint')
+    log_message("GUI initialized. Running main loop.")
+    root.mainloop()
+    return app